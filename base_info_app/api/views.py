@@ -1,44 +1,37 @@
 from rest_framework import viewsets
 from rest_framework.response import Response
-from base_info_app.api.serializer import BaseInfoSerializer
+from base_info_app.snapshot import platform_snapshot
 from rest_framework.permissions import AllowAny
-from offers_app.models import Offer
-from offers_app.tests import User
-from reviews_app.models import Reviews
-from django.db.models import Avg
+from core.async_views import AsyncReadMixin
 
-class BaseInfoViewSet(viewsets.ModelViewSet):
+class BaseInfoViewSet(AsyncReadMixin, viewsets.ViewSet):
     """
     A ViewSet that provides global platform statistics.
 
-    This ViewSet overrides the standard list method to aggregate data 
-    from different models (Reviews, Users, Offers) and returns a 
-    summary instead of a simple model list.
+    This ViewSet only has a list action, which returns a summary of 
+    different models (Reviews, Users, Offers) instead of a model list. 
+    The list is served as a coroutine (see AsyncReadMixin).
     """
-    queryset = Reviews.objects.all()   
-    serializer_class = BaseInfoSerializer
     permission_classes = [AllowAny]
     authentication_classes = []
+    async_actions = ('list',)
     
     def list(self, request, *args, **kwargs):
         """
-        Calculates and returns a set of platform-wide metrics.
+        Returns a set of platform-wide metrics.
         
         The data includes:
         - Total number of reviews
         - Weighted average of all star ratings
         - Total count of registered business users
         - Total number of service offers currently available
+        The metrics come from the in-memory platform snapshot, which is 
+        refreshed from the maintained counters (see base_info_app.snapshot).
         """
-        data = {
-            "review_count": Reviews.objects.count(),
-            "average_rating": Reviews.objects.aggregate(Avg('rating'))['rating__avg'] or 0,
-            "business_profile_count": User.objects.filter(type = 'business').count(),
-            "offer_count": Offer.objects.count(),
-        }
-        serializer = BaseInfoSerializer(data)
+        return Response(platform_snapshot.get())
 
-        return Response(serializer.data)
-        
-
-   
\ No newline at end of file
+    async def alist(self, request, *args, **kwargs):
+        """
+        Async variant of list(); a fresh snapshot is answered without any query.
+        """
+        return Response(await platform_snapshot.aget())
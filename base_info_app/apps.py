@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class BaseInfoAppConfig(AppConfig):
     name = 'base_info_app'
+
+    def ready(self):
+        """
+        Connects the receivers that mark the base-info snapshot stale.
+        """
+        from base_info_app import snapshot  # noqa: F401
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from base_info_app.models import PlatformCounts
+
+
+class Command(BaseCommand):
+    """
+    Recounts the business users and offers behind /api/base-info/. The
+    snapshot does this on its own once per BASE_INFO_RECONCILE_SECONDS;
+    run it after bulk imports to correct the figures right away. The review
+    figures are rebuilt by 'rebuild_review_stats'.
+    """
+    help = "Reconciles the platform counters with the user and offer tables."
+
+    def handle(self, *args, **options):
+        counts = PlatformCounts.objects.reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            f"Counted {counts.business_profile_count} business users and {counts.offer_count} offers."
+        ))
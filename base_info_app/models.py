@@ -1,3 +1,98 @@
-from django.db import models
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 
-# Create your models here.
+from offers_app.models import Offer
+
+
+class PlatformCountsQuerySet(models.QuerySet):
+    """
+    Write path of the platform counters: deltas from single writes and the
+    full reconciliation against the source tables.
+    """
+
+    def add(self, **deltas):
+        """
+        Adds the deltas with one UPDATE of the platform row. A missing row
+        is created by a reconciliation, which already includes the write
+        of the current transaction.
+        """
+        changes = {
+            field: F(field) + amount if amount > 0 else Greatest(F(field) + amount, Value(0))
+            for field, amount in deltas.items() if amount
+        }
+        if changes and not self.filter(pk=PlatformCounts.PLATFORM).update(**changes):
+            self.reconcile()
+
+    def reconcile(self):
+        """
+        Recounts business users and offers. The platform row is locked
+        first, so deltas of concurrent writes wait instead of being lost.
+        """
+        with transaction.atomic(using=self.db):
+            list(self.select_for_update().filter(pk=PlatformCounts.PLATFORM))
+            counts = {
+                'business_profile_count': get_user_model().objects.filter(type='business').count(),
+                'offer_count': Offer.objects.count(),
+                'reconciled_at': timezone.now(),
+            }
+            counts, _ = self.update_or_create(pk=PlatformCounts.PLATFORM, defaults=counts)
+        return counts
+
+
+class PlatformCounts(models.Model):
+    """
+    Number of business users and offers on the platform, stored in a single
+    row. Single saves and deletes of users and offers apply their delta, as
+    does the bulk insert of offers_app.api.serializer.create_offers(); other
+    bulk writes are not counted and are corrected by the periodic
+    reconciliation (see base_info_app.snapshot and the 'reconcile_base_info'
+    command). The review figures live in reviews_app.PlatformReviewStats.
+    """
+    PLATFORM = 1
+
+    business_profile_count = models.PositiveIntegerField(default=0)
+    offer_count = models.PositiveIntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    objects = PlatformCountsQuerySet.as_manager()
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=cls.PLATFORM).first() or cls.objects.reconcile()
+
+
+@receiver(post_save, sender=Offer)
+def count_created_offer(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        PlatformCounts.objects.add(offer_count=1)
+
+
+@receiver(post_delete, sender=Offer)
+def count_deleted_offer(sender, instance, **kwargs):
+    PlatformCounts.objects.add(offer_count=-1)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def count_business_user_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Signal receiver that counts new business users and users whose type
+    changed, comparing against the type they were loaded with.
+    """
+    if raw or (update_fields is not None and 'type' not in update_fields):
+        return
+    previous = None if created else instance.loaded_value('type', instance.type)
+    delta = (instance.type == 'business') - (previous == 'business')
+    if delta:
+        PlatformCounts.objects.add(business_profile_count=delta)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def count_deleted_business_user(sender, instance, **kwargs):
+    if instance.loaded_value('type', instance.type) == 'business':
+        PlatformCounts.objects.add(business_profile_count=-1)
@@ -0,0 +1,126 @@
+"""
+Process-local snapshot of the platform figures served by /api/base-info/.
+
+The figures are read from the maintained counter rows (PlatformReviewStats
+and PlatformCounts), never from the source tables. Every process keeps the
+serialized result in memory for settings.BASE_INFO_MAX_AGE seconds. When it
+is stale, a single caller refreshes it while the others keep answering with
+the previous value; only a process without any value makes callers wait for
+the first load. Writes in the same process mark it stale right away,
+other processes pick them up within the maximum age. The refresh also
+reconciles the counters with the source tables once they are older than
+settings.BASE_INFO_RECONCILE_SECONDS. The receivers below are connected
+when the app is ready.
+"""
+import datetime
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from base_info_app.api.serializer import BaseInfoSerializer
+from base_info_app.models import PlatformCounts
+from offers_app.models import Offer
+from reviews_app.models import PlatformReviewStats, Reviews
+
+
+class PlatformSnapshot:
+
+    def __init__(self):
+        self._data = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def max_age(self):
+        return getattr(settings, 'BASE_INFO_MAX_AGE', 5)
+
+    @property
+    def reconcile_interval(self):
+        return getattr(settings, 'BASE_INFO_RECONCILE_SECONDS', 3600)
+
+    def get(self):
+        data = self._data
+        if data is not None and time.monotonic() < self._expires:
+            return data
+        # Only the first caller without a value waits for the lock.
+        if not self._lock.acquire(blocking=data is None):
+            return data
+        try:
+            if self._data is None or time.monotonic() >= self._expires:
+                self._data = self.load()
+                self._expires = time.monotonic() + self.max_age
+            return self._data
+        finally:
+            self._lock.release()
+
+    async def aget(self):
+        """
+        Async variant of get(). A fresh snapshot is returned without leaving
+        the event loop; refreshes run in the shared sync thread.
+        """
+        data = self._data
+        if data is not None and time.monotonic() < self._expires:
+            return data
+        return await sync_to_async(self.get)()
+
+    def load(self):
+        counts = PlatformCounts.current()
+        stale_before = timezone.now() - datetime.timedelta(seconds=self.reconcile_interval)
+        if counts.reconciled_at is None or counts.reconciled_at < stale_before:
+            counts = PlatformCounts.objects.reconcile()
+        reviews = PlatformReviewStats.current()
+        return BaseInfoSerializer({
+            "review_count": reviews.review_count,
+            "average_rating": reviews.average_rating,
+            "business_profile_count": counts.business_profile_count,
+            "offer_count": counts.offer_count,
+        }).data
+
+    def invalidate(self):
+        """
+        Marks the snapshot stale now and once more after the surrounding
+        transaction commits, like VersionedResponseCache.bump().
+        """
+        self._expire()
+        transaction.on_commit(self._expire)
+
+    def _expire(self):
+        self._expires = 0.0
+
+    def clear(self):
+        with self._lock:
+            self._data = None
+            self._expires = 0.0
+
+
+platform_snapshot = PlatformSnapshot()
+
+
+@receiver(post_save, sender=Reviews)
+@receiver(post_delete, sender=Reviews)
+@receiver(post_delete, sender=Offer)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_platform_snapshot(sender, **kwargs):
+    platform_snapshot.invalidate()
+
+
+@receiver(post_save, sender=Offer)
+def invalidate_platform_snapshot_on_offer_create(sender, created, **kwargs):
+    if created:
+        platform_snapshot.invalidate()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_platform_snapshot_on_user_save(sender, created, update_fields=None, **kwargs):
+    """
+    Saves that cannot change the account type, such as 'last_login' on
+    login, keep the snapshot.
+    """
+    if created or update_fields is None or 'type' in update_fields:
+        platform_snapshot.invalidate()
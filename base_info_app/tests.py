@@ -1,3 +1,154 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from base_info_app.models import PlatformCounts
+from base_info_app.snapshot import platform_snapshot
+from offers_app.models import Offer
+from reviews_app.models import Reviews
+
+User = get_user_model()
+
+OFFER_PAYLOAD = {
+    "title": "Web", "description": "Design", "details": [
+        {"title": "Basic", "revisions": 1, "delivery_time_in_days": 2, "price": "20.00",
+         "features": {}, "offer_type": "basic"},
+    ],
+}
+
+
+class PlatformCountsTests(APITestCase):
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', password='password123', type='business')
+        self.customer = User.objects.create_user(username='buyer', password='password123', type='customer')
+
+    def counts(self):
+        counts = PlatformCounts.objects.get()
+        return counts.business_profile_count, counts.offer_count
+
+    def test_counts_follow_user_and_offer_writes(self):
+        self.assertEqual(self.counts(), (1, 0))
+
+        offer = Offer.objects.create(user=self.seller, title="Logo", description="Design")
+        Offer.objects.create(user=self.seller, title="Web", description="Design")
+        self.assertEqual(self.counts(), (1, 2))
+
+        offer.title = "Logo Design"
+        offer.save()
+        offer.delete()
+        self.assertEqual(self.counts(), (1, 1))
+
+        customer = User.objects.get(pk=self.customer.pk)
+        customer.type = 'business'
+        customer.save()
+        customer.save()
+        self.assertEqual(self.counts(), (2, 1))
+
+        self.seller.delete()
+        self.assertEqual(self.counts(), (1, 0))
+
+    def test_login_does_not_touch_the_counters(self):
+        seller = User.objects.get(pk=self.seller.pk)
+        with CaptureQueriesContext(connection) as queries:
+            seller.last_login = timezone.now()
+            seller.save(update_fields=['last_login'])
+
+        self.assertFalse(any('platformcounts' in query['sql'] for query in queries.captured_queries))
+
+    def test_offers_created_through_the_api_are_counted(self):
+        self.client.force_authenticate(user=self.seller)
+        response = self.client.post(reverse('offers-list'), [OFFER_PAYLOAD, OFFER_PAYLOAD], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.counts(), (1, 2))
+
+    def test_reconcile_corrects_bulk_writes_outside_the_api(self):
+        Offer.objects.create(user=self.seller, title="Logo", description="Design")
+        Offer.objects.bulk_create([
+            Offer(user=self.seller, title=f"Bulk {i}", description="Import") for i in range(3)
+        ])
+        self.assertEqual(self.counts(), (1, 1))
+
+        counts = PlatformCounts.objects.reconcile()
+
+        self.assertEqual((counts.business_profile_count, counts.offer_count), (1, 4))
+        self.assertIsNotNone(counts.reconciled_at)
+
+
+class BaseInfoSnapshotTests(APITestCase):
+
+    def setUp(self):
+        platform_snapshot.clear()
+        self.addCleanup(platform_snapshot.clear)
+        self.url = reverse('base-info-list')
+        self.seller = User.objects.create_user(username='seller', password='password123', type='business')
+        self.customer = User.objects.create_user(username='buyer', password='password123', type='customer')
+        Offer.objects.create(user=self.seller, title="Logo", description="Design")
+        Reviews.objects.create(reviewer=self.customer, business_user=self.seller, rating=4, description="Gut")
+
+    def test_repeated_requests_are_served_from_memory(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'review_count': 1, 'average_rating': 4.0, 'business_profile_count': 1, 'offer_count': 1,
+        })
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['offer_count'], 1)
+
+    def test_writes_in_this_process_mark_the_snapshot_stale(self):
+        self.client.get(self.url)
+
+        Offer.objects.create(user=self.seller, title="Web", description="Design")
+        Reviews.objects.create(reviewer=self.seller, business_user=self.seller, rating=2, description="Hm")
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['offer_count'], 2)
+        self.assertEqual(response.data['review_count'], 2)
+        self.assertEqual(response.data['average_rating'], 3.0)
+
+    def test_offer_created_through_the_api_marks_the_snapshot_stale(self):
+        self.client.get(self.url)
+
+        self.client.force_authenticate(user=self.seller)
+        response = self.client.post(reverse('offers-list'), OFFER_PAYLOAD, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['offer_count'], 2)
+
+    def test_stale_snapshot_is_refreshed_by_one_caller_only(self):
+        data = platform_snapshot.get()
+        platform_snapshot.invalidate()
+
+        # Another caller is refreshing: the previous value is answered right away.
+        with platform_snapshot._lock, self.assertNumQueries(0):
+            self.assertIs(platform_snapshot.get(), data)
+
+        self.assertIsNot(platform_snapshot.get(), data)
+
+    @override_settings(BASE_INFO_RECONCILE_SECONDS=60)
+    def test_refresh_reconciles_old_counters(self):
+        Offer.objects.bulk_create([Offer(user=self.seller, title="Bulk", description="Import")])
+        PlatformCounts.objects.update(reconciled_at=timezone.now() - datetime.timedelta(minutes=5))
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data['offer_count'], 2)
+
+    async def test_async_list_uses_the_snapshot(self):
+        data = await platform_snapshot.aget()
+
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['review_count'], data['review_count'])
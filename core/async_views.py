@@ -0,0 +1,168 @@
+"""
+Helpers for async views that live next to the synchronous DRF API.
+
+DRF views are synchronous, so under ASGI every request occupies a worker
+thread for its whole duration. Streaming endpoints are written as plain async
+Django views, and hot read endpoints of DRF viewsets get native coroutine
+variants through AsyncReadMixin. Both use the async ORM for database access.
+"""
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.response import Response
+
+from core.authentication import CachedTokenAuthentication
+
+
+async def aload(queryset, chunk_size=2000):
+    """
+    Evaluates the queryset with the async ORM and returns the objects as a
+    list. The chunk size is required for prefetch_related lookups.
+    """
+    return [obj async for obj in queryset.aiterator(chunk_size=chunk_size)]
+
+
+async def aget_token_user(request, query_param=None):
+    """
+    Returns the active user of the 'Authorization: Token <key>' header,
+    or None if the header is missing or the token is not valid.
+    Without the header the key is read from the 'query_param' query
+    parameter, if given, for clients that cannot set headers.
+    """
+    authentication = CachedTokenAuthentication()
+    try:
+        user_auth = await authentication.aauthenticate(request)
+        if user_auth is None and query_param and request.GET.get(query_param):
+            user_auth = await authentication.aauthenticate_credentials(request.GET[query_param])
+    except exceptions.AuthenticationFailed:
+        return None
+    return user_auth[0] if user_auth else None
+
+
+def unauthorized_response():
+    response = JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    response.headers['WWW-Authenticate'] = 'Token'
+    return response
+
+
+class AsyncReadMixin:
+    """
+    ViewSet mixin that serves the actions in 'async_actions' as coroutines.
+
+    For these actions the view returned by as_view() is an async view: the
+    token lookup, the count and the rows are read with the async ORM
+    (aauthenticate(), acount(), aiterator(), aget()) and the request never
+    occupies a worker thread while it waits for the database. Permissions,
+    filters and serializers are shared with the sync implementation. Every
+    other action, and all actions when settings.ASYNC_READ_VIEWS is off,
+    is handed to the regular synchronous view.
+
+    Filter backends may run queries while building the queryset, so they are
+    applied through sync_to_async. Serializers must only touch data that was
+    loaded up front (select_related/prefetch_related in get_queryset()).
+    """
+    async_actions = ('list', 'retrieve')
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        actions = dict(sync_view.actions)
+        if 'get' in actions and 'head' not in actions:
+            actions['head'] = actions['get']
+        if not any(action in cls.async_actions for action in actions.values()):
+            return sync_view
+
+        async def view(request, *args, **kwargs):
+            action = actions.get(request.method.lower())
+            if action not in cls.async_actions or not getattr(settings, 'ASYNC_READ_VIEWS', True):
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, method_action in actions.items():
+                setattr(self, method, getattr(self, method_action))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        markcoroutinefunction(view)
+        view.cls = cls
+        view.initkwargs = sync_view.initkwargs
+        view.actions = sync_view.actions
+        view.sync_view = sync_view
+        return csrf_exempt(view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        Coroutine counterpart of APIView.dispatch() for the async actions.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.aperform_authentication(request)
+            self.initial(request, *args, **kwargs)
+            handler = getattr(self, f'a{self.action}')
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aperform_authentication(self, request):
+        """
+        Authenticates the request up front, so initial() finds the user set.
+        Authenticators without an aauthenticate() method run in a thread.
+        """
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, 'aauthenticate'):
+                    user_auth = await authenticator.aauthenticate(request)
+                else:
+                    user_auth = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if user_auth is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth
+                return
+        request._not_authenticated()
+
+    async def afilter_queryset(self, queryset):
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+    async def aget_object(self):
+        """
+        Coroutine counterpart of GenericAPIView.get_object().
+        """
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(await aload(queryset), many=True).data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
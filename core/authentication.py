@@ -0,0 +1,295 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+
+logger = logging.getLogger(__name__)
+
+CachedToken = namedtuple('CachedToken', ['key', 'created', 'user_id', 'user_values', 'expires'])
+
+
+class TokenCache:
+    """
+    Bounded, process-local LRU of token keys and the user fields that the
+    views, permissions and serializers read (USER_FIELDS), kept for
+    settings.AUTH_TOKEN_CACHE_TTL seconds.
+
+    Revocations are announced through a Django cache shared by all
+    processes (AUTH_TOKEN_CACHE_ALIAS): every deleted token or changed user
+    writes a new random revocation generation. The revoking process drops
+    the affected entries right away; every process reads the generation at
+    most once per AUTH_TOKEN_REVOCATION_POLL_SECONDS and empties its cache
+    when it changed. Cache hits in between cost no query at all, so a
+    revocation reaches other processes within the poll interval.
+
+    Without a shared backend (no alias, a local-memory or a dummy cache) the
+    token cache is disabled. If the shared cache cannot be read, e.g. its
+    table was never created, lookups miss and requests fall back to the
+    regular token lookup.
+    """
+    USER_FIELDS = ('id', 'username', 'first_name', 'last_name', 'email', 'type', 'is_superuser', 'is_active')
+    generation_key = 'auth-token:generation'
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = None
+        self._polled_at = None
+
+    @property
+    def enabled(self):
+        alias = getattr(settings, 'AUTH_TOKEN_CACHE_ALIAS', None)
+        return alias is not None and not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+    @property
+    def cache(self):
+        return caches[settings.AUTH_TOKEN_CACHE_ALIAS]
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 10000)
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 60)
+
+    @property
+    def poll_interval(self):
+        return getattr(settings, 'AUTH_TOKEN_REVOCATION_POLL_SECONDS', 1)
+
+    def _poll_due(self):
+        return self._polled_at is None or time.monotonic() - self._polled_at >= self.poll_interval
+
+    def _set_generation(self, generation):
+        with self._lock:
+            if generation != self.generation:
+                self._entries.clear()
+                self.generation = generation
+            self._polled_at = time.monotonic()
+
+    def poll(self):
+        """
+        Reads the revocation generation if the poll interval has passed.
+        Returns False if the shared cache could not be read.
+        """
+        if self._poll_due():
+            try:
+                generation = self.cache.get(self.generation_key)
+            except DatabaseError:
+                logger.warning("Token revocations cannot be read, the token cache is bypassed", exc_info=True)
+                return False
+            self._set_generation(generation)
+        return True
+
+    async def apoll(self):
+        if self._poll_due():
+            try:
+                generation = await self.cache.aget(self.generation_key)
+            except DatabaseError:
+                logger.warning("Token revocations cannot be read, the token cache is bypassed", exc_info=True)
+                return False
+            self._set_generation(generation)
+        return True
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def lookup(self, key):
+        """
+        Returns the cached entry for key, or None on a miss or revocation.
+        """
+        return self._get(key) if self.poll() else None
+
+    async def alookup(self, key):
+        return self._get(key) if await self.apoll() else None
+
+    def store(self, token, generation):
+        """
+        Caches the token and its user. generation is the revocation
+        generation seen before the token was loaded; if a revocation was
+        noticed in the meantime, the token may be stale and is not cached.
+        """
+        user = token.user
+        entry = CachedToken(
+            token.key, token.created, user.pk,
+            {name: getattr(user, name) for name in self.USER_FIELDS},
+            time.monotonic() + self.ttl,
+        )
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[token.key] = entry
+            self._entries.move_to_end(token.key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def drop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def revoke_token(self, key):
+        """
+        Invalidates the token in every process, now and once more after the
+        surrounding transaction commits.
+        """
+        if not self.enabled:
+            return
+        self.drop(key)
+        self._announce()
+        transaction.on_commit(self._announce)
+
+    def revoke_user(self, user_id):
+        """
+        Invalidates all cached tokens of the user in every process.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.user_id == user_id]:
+                del self._entries[key]
+        self._announce()
+        transaction.on_commit(self._announce)
+
+    def _announce(self):
+        try:
+            self.cache.set(self.generation_key, uuid.uuid4().hex, timeout=None)
+        except DatabaseError:
+            logger.warning("Token revocation cannot be announced", exc_info=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation = None
+            self._polled_at = None
+
+
+token_cache = TokenCache()
+
+
+class AsyncTokenAuthentication(TokenAuthentication):
+    """
+    DRF token authentication with an additional coroutine variant.
+
+    Synchronous views behave exactly like with TokenAuthentication. Async
+    views (see core/async_views.py) call aauthenticate(), which looks up the
+    token with the async ORM and raises the same errors.
+    """
+
+    def get_key(self, request):
+        """
+        Returns the token key of the Authorization header, or None if the
+        header does not use this scheme.
+        """
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            msg = _('Invalid token header. No credentials provided.')
+            raise exceptions.AuthenticationFailed(msg)
+        elif len(auth) > 2:
+            msg = _('Invalid token header. Token string should not contain spaces.')
+            raise exceptions.AuthenticationFailed(msg)
+
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            msg = _('Invalid token header. Token string should not contain invalid characters.')
+            raise exceptions.AuthenticationFailed(msg)
+
+    def authenticate(self, request):
+        key = self.get_key(request)
+        if key is None:
+            return None
+        return self.authenticate_credentials(key)
+
+    async def aauthenticate(self, request):
+        key = self.get_key(request)
+        if key is None:
+            return None
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        model = self.get_model()
+        try:
+            token = await model.objects.select_related('user').aget(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
+
+
+class CachedTokenAuthentication(AsyncTokenAuthentication):
+    """
+    Token authentication answering repeated requests from the token cache.
+
+    A hit costs no query; the revocation generation is read at most once
+    per poll interval and process (see TokenCache). The request gets a user with the fields of
+    TokenCache.USER_FIELDS loaded; other fields, such as the password or
+    the dates, are deferred and cost one query each on first access.
+    request.auth is a Token instance built from the cache, so LogoutView
+    can still delete it. Misses run the regular lookup and fill the cache.
+    Without a shared cache backend every request runs the regular lookup.
+    """
+    cache = token_cache
+
+    def authenticate_credentials(self, key):
+        if not self.cache.enabled:
+            return super().authenticate_credentials(key)
+        entry = self.cache.lookup(key)
+        if entry is not None:
+            return self.build(entry)
+        generation = self.cache.generation
+        user, token = super().authenticate_credentials(key)
+        self.cache.store(token, generation)
+        return user, token
+
+    async def aauthenticate_credentials(self, key):
+        if not self.cache.enabled:
+            return await super().aauthenticate_credentials(key)
+        entry = await self.cache.alookup(key)
+        if entry is not None:
+            return self.build(entry)
+        generation = self.cache.generation
+        user, token = await super().aauthenticate_credentials(key)
+        self.cache.store(token, generation)
+        return user, token
+
+    def build(self, entry):
+        """
+        Returns (user, token) instances for a cache entry, as if they had 
+        been loaded from the database with only() the cached fields.
+        """
+        model = self.get_model()
+        user_model = model._meta.get_field('user').related_model
+        values = entry.user_values
+        # from_db() expects the values in the order of the model's fields.
+        names = [field.attname for field in user_model._meta.concrete_fields if field.attname in values]
+        user = user_model.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])
+        token = model.from_db(DEFAULT_DB_ALIAS, ['key', 'user_id', 'created'], [entry.key, entry.user_id, entry.created])
+        token.user = user
+        return user, token
+
@@ -0,0 +1,184 @@
+import datetime
+import hashlib
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def resolve_path(instance, path):
+    """
+    Follows a field path such as 'user__review_stats__last_review_at' on a
+    loaded instance. A missing related object resolves to None, like in
+    values_list().
+    """
+    value = instance
+    for attribute in path.split('__'):
+        try:
+            value = getattr(value, attribute)
+        except ObjectDoesNotExist:
+            return None
+        if value is None:
+            return None
+    return value
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin adding ETag / Last-Modified validators to retrieve and list.
+
+    The validators are derived from a timestamp column ('last_modified_field',
+    which may span a relation such as 'offer__updated_at'). For requests that
+    carry If-None-Match or If-Modified-Since they are read with a single small
+    query before the object is loaded, and a match returns 304 without
+    serializing anything. Lists use the latest timestamp and the row count of the
+    filtered queryset as collection validator. Combined with AsyncReadMixin,
+    retrieve also has a coroutine variant.
+
+    Objects whose representation embeds data of other rows list those
+    columns in 'validator_fields', e.g. the rating statistics of the owner.
+    Their values are part of the ETag, and datetimes among them count
+    towards Last-Modified.
+    """
+    last_modified_field = 'updated_at'
+    validator_fields = ()
+    conditional_lookup_field = None
+
+    def get_conditional_queryset(self):
+        return self.filter_queryset(self.get_queryset()).prefetch_related(None).order_by()
+
+    def get_object_validators(self):
+        """
+        Returns (etag, last_modified) for the requested object, or None
+        if it does not exist.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.conditional_lookup_field or self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            row = self.get_conditional_queryset().filter(**lookup).values_list(
+                'pk', self.last_modified_field, *self.validator_fields
+            ).first()
+        except (TypeError, ValueError):
+            return None
+        return self.build_object_validators(row)
+
+    async def aget_object_validators(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.conditional_lookup_field or self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        queryset = await self.afilter_queryset(self.get_queryset())
+        queryset = queryset.prefetch_related(None).order_by()
+        try:
+            row = await queryset.filter(**lookup).values_list(
+                'pk', self.last_modified_field, *self.validator_fields
+            ).afirst()
+        except (TypeError, ValueError):
+            return None
+        return self.build_object_validators(row)
+
+    def get_collection_validators(self):
+        """
+        Returns (etag, last_modified) for the filtered collection.
+        """
+        stats = self.get_conditional_queryset().aggregate(
+            modified=Max(self.last_modified_field), count=Count('pk')
+        )
+        modified = stats['modified']
+        stamp = modified.isoformat() if modified else ''
+        return self.build_etag('list', stamp, stats['count'], self.request.get_full_path()), modified
+
+    def get_instance_validators(self, instance):
+        """
+        Returns (etag, last_modified) for an already loaded object, 
+        matching the values of get_object_validators().
+        """
+        row = [instance.pk] + [
+            resolve_path(instance, path) for path in (self.last_modified_field, *self.validator_fields)
+        ]
+        return self.build_object_validators(row)
+
+    def build_object_validators(self, row):
+        """
+        Turns a (pk, last modified, *validator fields) row into (etag, 
+        last_modified), or None if the row or its timestamp is missing.
+        """
+        if row is None or row[1] is None:
+            return None
+        pk, modified, *extra = row
+        stamps = [value for value in extra if isinstance(value, datetime.datetime)]
+        modified = max([modified, *stamps])
+        return self.build_etag(pk, modified.isoformat(), *extra), modified
+
+    def build_etag(self, *parts):
+        raw = ':'.join(str(part) for part in (self.__class__.__name__, self.action, *parts))
+        return '"%s"' % hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def is_conditional_request(self):
+        meta = self.request.META
+        return 'HTTP_IF_NONE_MATCH' in meta or 'HTTP_IF_MODIFIED_SINCE' in meta
+
+    def conditional_response(self, validators, respond):
+        """
+        Answers with 304 if the request validators match, otherwise calls
+        respond() and adds the validator headers to its response.
+        """
+        if validators is None:
+            return respond()
+        etag, modified = validators
+        last_modified = int(modified.timestamp()) if modified else None
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = respond()
+        return self.add_validator_headers(response, validators)
+
+    async def aconditional_response(self, validators, respond):
+        """
+        Async variant of conditional_response(); respond is a coroutine function.
+        """
+        if validators is None:
+            return await respond()
+        etag, modified = validators
+        last_modified = int(modified.timestamp()) if modified else None
+        response = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await respond()
+        return self.add_validator_headers(response, validators)
+
+    def add_validator_headers(self, response, validators):
+        if validators is None or response.status_code not in (200, 304):
+            return response
+        etag, modified = validators
+        response.headers['ETag'] = etag
+        if modified is not None:
+            response.headers['Last-Modified'] = http_date(int(modified.timestamp()))
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Only requests carrying validators pay for the validator query. 
+        Plain requests load the object once and take the validators from it.
+        """
+        if self.is_conditional_request():
+            return self.conditional_response(
+                self.get_object_validators(), lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+            )
+        instance = self.get_object()
+        response = Response(self.get_serializer(instance).data)
+        return self.add_validator_headers(response, self.get_instance_validators(instance))
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_collection_validators(), lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        if self.is_conditional_request():
+            return await self.aconditional_response(
+                await self.aget_object_validators(), lambda: super(ConditionalGetMixin, self).aretrieve(request, *args, **kwargs)
+            )
+        instance = await self.aget_object()
+        response = Response(self.get_serializer(instance).data)
+        return self.add_validator_headers(response, self.get_instance_validators(instance))
+
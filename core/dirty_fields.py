@@ -0,0 +1,84 @@
+import copy
+
+from django.db.models.fields.files import FieldFile
+
+
+def _comparable(value):
+    """
+    Returns a copy of a column value that later in-place changes cannot
+    alter. Files compare by their storage name.
+    """
+    if isinstance(value, FieldFile):
+        return value.name
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
+class DirtyFieldsMixin:
+    """
+    Model mixin that only writes the columns that changed since the instance
+    was loaded or last saved.
+
+    from_db() remembers the loaded column values. A save() of a loaded
+    instance without explicit update_fields turns into an UPDATE of the
+    changed columns plus the auto_now timestamps, or into no query at all
+    when nothing changed; like any save with empty update_fields, the latter
+    sends no signals. Explicit update_fields, inserts and instances that
+    were not loaded from the database save as usual.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+
+    def _remember_loaded_values(self):
+        self._loaded_values = {
+            field.attname: _comparable(self.__dict__[field.attname])
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def loaded_value(self, attname, default=None):
+        """
+        Returns the value attname had when the instance was loaded or last
+        saved, or default if it was not loaded.
+        """
+        return getattr(self, '_loaded_values', {}).get(attname, default)
+
+    def get_dirty_fields(self):
+        """
+        Returns the names of the loaded fields whose value changed. Fields
+        that were deferred and loaded later count as changed.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return [field.name for field in self._meta.concrete_fields if not field.primary_key]
+        missing = object()
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.attname in self.__dict__
+            and loaded.get(field.attname, missing) != _comparable(self.__dict__[field.attname])
+        ]
+
+    def save(self, *args, **kwargs):
+        if (
+            not args
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+            and not self._state.adding
+            and hasattr(self, '_loaded_values')
+        ):
+            dirty = self.get_dirty_fields()
+            if dirty:
+                dirty += [
+                    field.name for field in self._meta.concrete_fields
+                    if getattr(field, 'auto_now', False) and field.name not in dirty
+                ]
+            kwargs['update_fields'] = dirty
+        super().save(*args, **kwargs)
+        self._remember_loaded_values()
@@ -0,0 +1,121 @@
+"""
+Publish/subscribe of small JSON events for streaming endpoints.
+
+Models publish events after their transaction committed; async views
+subscribe to the channels of the requesting user and forward every event
+to the client. The backend is swappable through settings.EVENTS_BACKEND.
+The default InProcessBackend only delivers events within one process, which
+is enough for a single ASGI worker; several workers need a shared backend
+(e.g. one built on Redis pub/sub) implementing the same three methods.
+"""
+import asyncio
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class Subscription:
+    """
+    Queue of events for one subscriber, bound to the event loop it was
+    created on. Events can be put from any thread.
+    """
+
+    def __init__(self, channels, max_size=100):
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_size)
+
+    def put(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client that does not keep up loses events instead of memory.
+            logger.warning("Dropping event for slow subscriber on %s", self.channels)
+
+    async def get(self, timeout=None):
+        """
+        Returns the next event, or None if none arrived within timeout seconds.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBackend:
+    """
+    Delivers events to the subscribers of the current process.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        subscription = Subscription(channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.put(event)
+            except RuntimeError:
+                # The subscriber's event loop is already closed.
+                self.unsubscribe(subscription)
+
+
+def get_backend():
+    """
+    Returns the configured backend, creating it on first use.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            path = getattr(settings, 'EVENTS_BACKEND', 'core.events.InProcessBackend')
+            _backend = import_string(path)()
+    return _backend
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def publish_on_commit(channels, event):
+    """
+    Publishes the event to all channels once the current transaction
+    commits, so subscribers never see data that is rolled back.
+    """
+    channels = list(dict.fromkeys(channels))
+
+    def publish():
+        backend = get_backend()
+        for channel in channels:
+            backend.publish(channel, event)
+
+    transaction.on_commit(publish)
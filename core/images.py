@@ -0,0 +1,186 @@
+"""
+Background generation of resized image variants.
+
+Uploaded files are written to storage by Django in chunks during the request.
+Everything else happens after the transaction committed, on a small thread
+pool: the original is opened once, every variant from settings.IMAGE_VARIANTS
+is rendered as WebP and saved next to it, and the resulting storage names are
+stored in a JSON field of the model. Serializers read that field to expose
+variant URLs without touching the storage. Without Pillow installed, no
+variants are produced and clients keep using the original file.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:
+    Image = None
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VARIANTS = {
+    'thumbnail': (320, 320),
+    'medium': (960, 960),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_variant_sizes():
+    return getattr(settings, 'IMAGE_VARIANTS', DEFAULT_VARIANTS)
+
+
+def get_executor():
+    """
+    Returns the shared worker pool, creating it on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'IMAGE_WORKER_THREADS', 2),
+                thread_name_prefix='image-variants',
+            )
+    return _executor
+
+
+def variant_path(name, variant):
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'variants', f'{stem}_{variant}.webp')
+
+
+def needs_variants(instance, field_name, variants_field='image_variants'):
+    """
+    Returns True if the file currently stored in field_name has not been
+    processed yet. Only compares in-memory values, so it is safe to call
+    from a post_save receiver.
+    """
+    name = getattr(instance, field_name).name or ''
+    return (getattr(instance, variants_field) or {}).get('source', '') != name
+
+
+def schedule_variants(instance, field_name, variants_field='image_variants'):
+    """
+    Queues variant generation for the instance once the current transaction
+    commits. Instances without a file only get their stale variants cleared.
+    """
+    name = getattr(instance, field_name).name or ''
+    label = instance._meta.label
+    pk = instance.pk
+    transaction.on_commit(
+        lambda: get_executor().submit(_run_job, label, pk, field_name, variants_field, name)
+    )
+
+
+def render_variants(storage, name, sizes):
+    """
+    Renders all variants of the stored image and returns a mapping of
+    variant name to storage name. Returns an empty mapping for files
+    that are not images.
+    """
+    if Image is None:
+        return {}
+    try:
+        with storage.open(name, 'rb') as original:
+            image = Image.open(original)
+            image.load()
+    except (UnidentifiedImageError, OSError):
+        return {}
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    rendered = {}
+    for variant, size in sizes.items():
+        resized = image.copy()
+        resized.thumbnail(size)
+        buffer = BytesIO()
+        resized.save(buffer, 'WEBP', quality=80)
+        path = variant_path(name, variant)
+        if storage.exists(path):
+            storage.delete(path)
+        rendered[variant] = storage.save(path, ContentFile(buffer.getvalue()))
+    return rendered
+
+
+def process_variants(label, pk, field_name, variants_field, name):
+    """
+    Generates and stores the variants of one file. Skips the job if the file 
+    changed again in the meantime, and only stores the result if it still 
+    belongs to the current file. Variants of the previous file are removed 
+    from storage. Returns the stored variant mapping, or None if skipped.
+    """
+    model = apps.get_model(label)
+    storage = model._meta.get_field(field_name).storage
+    row = model.objects.filter(pk=pk).values_list(field_name, variants_field).first()
+    if row is None or (row[0] or '') != name:
+        return None
+    previous = row[1] or {}
+
+    variants = dict(render_variants(storage, name, get_variant_sizes()) if name else {}, source=name)
+    changes = {variants_field: variants}
+    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        # The variant URLs are part of the representation, so validators must change.
+        changes['updated_at'] = timezone.now()
+    updated = model.objects.filter(pk=pk, **{field_name: name}).update(**changes)
+    if not updated:
+        return None
+    for variant, path in previous.items():
+        if variant != 'source' and path not in variants.values():
+            storage.delete(path)
+    return variants
+
+
+def _run_job(*args):
+    """
+    Worker thread entry point. Errors are logged instead of being lost in 
+    the future, and the thread's database connection is closed afterwards.
+    """
+    try:
+        process_variants(*args)
+    except Exception:
+        logger.exception("Generating image variants failed for %s", args[:2])
+    finally:
+        connection.close()
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Read-only serializer field that turns the stored variant names into
+    URLs, absolute when a request is available. Variants that have not
+    been generated yet are returned as None.
+    """
+
+    def __init__(self, storage=None, **kwargs):
+        self.storage = storage
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        storage = self.storage or default_storage
+        request = self.context.get('request')
+        value = value or {}
+        urls = {}
+        for variant in get_variant_sizes():
+            path = value.get(variant)
+            if not path:
+                urls[variant] = None
+                continue
+            url = storage.url(path)
+            urls[variant] = request.build_absolute_uri(url) if request is not None else url
+        return urls
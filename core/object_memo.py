@@ -0,0 +1,29 @@
+class ObjectMemoMixin:
+    """
+    ViewSet mixin that loads the requested object at most once per request.
+
+    DRF calls get_object() from the action, and views often call it again
+    from other hooks, e.g. get_serializer_class() choosing a serializer by a
+    field of the object or a permission needing it before the action runs.
+    The first call runs the lookup and the object permission checks; every
+    later call on the same view instance, which lives for one request,
+    returns the same object. The object queryset should join in everything
+    these hooks and the serializer read (select_related()).
+
+    Place it before AsyncReadMixin, so aget_object() fills the same memo and
+    sync hooks called from an async action never query the database.
+    """
+
+    def get_object(self):
+        try:
+            return self._object_memo
+        except AttributeError:
+            self._object_memo = super().get_object()
+            return self._object_memo
+
+    async def aget_object(self):
+        try:
+            return self._object_memo
+        except AttributeError:
+            self._object_memo = await super().aget_object()
+            return self._object_memo
@@ -0,0 +1,258 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.async_views import aload
+
+
+def _encode_value(value):
+    """
+    JSON fallback for sort key values. Datetimes keep their full
+    microsecond precision, which the keyset comparison depends on.
+    """
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f"Cannot encode cursor value of type {type(value).__name__}")
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on an indexed sort column plus the primary key.
+
+    Instead of OFFSET, every page continues after the last row of the previous
+    page with a WHERE (column, id) > (value, last_id) condition, and no COUNT
+    query is run. The view declares which columns may be used as sort key via
+    'cursor_ordering_fields' and the fallback via 'cursor_default_ordering';
+    the first ordering applied by OrderingFilter picks the key when allowed.
+    Nullable sort columns place NULL values at the end of the forward order.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    invalid_cursor_message = 'Invalid cursor'
+
+    @classmethod
+    def is_cursor_request(cls, request):
+        return (
+            cls.cursor_query_param in request.query_params
+            or request.query_params.get(cls.mode_query_param) == 'cursor'
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._set_page(list(self._page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self._set_page(await aload(self._page_queryset(queryset, request, view)))
+
+    def _page_queryset(self, queryset, request, view):
+        """
+        Returns the queryset of the requested page plus one look-ahead row.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.field, self.descending = self.get_sort_key(queryset, view)
+        self.nullable = queryset.model._meta.get_field(self.field).null
+
+        self.position = self.decode_cursor(request)
+        if self.position is None:
+            value = pk = None
+            self.reverse = False
+        else:
+            value, pk, self.reverse = self.position
+            value = self.coerce_cursor_value(queryset, value)
+
+        if self.reverse:
+            queryset = queryset.filter(self._before(value, pk)).order_by(*self._ordering(reverse=True))
+        else:
+            if self.position is not None:
+                queryset = queryset.filter(self._after(value, pk))
+            queryset = queryset.order_by(*self._ordering())
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, results):
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = self.position is not None, has_more
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_sort_key(self, queryset, view):
+        """
+        Returns the (field, descending) pair used as sort key.
+        """
+        allowed = getattr(view, 'cursor_ordering_fields', ['id'])
+        ordering = list(queryset.query.order_by)
+        if ordering and isinstance(ordering[0], str) and ordering[0].lstrip('-') in allowed:
+            candidate = ordering[0]
+        else:
+            candidate = getattr(view, 'cursor_default_ordering', '-id')
+        return candidate.lstrip('-'), candidate.startswith('-')
+
+    def _ordering(self, reverse=False):
+        descending = self.descending != reverse
+        options = {}
+        if self.nullable:
+            # NULL values trail the forward order, so they lead the reversed one.
+            options = {'nulls_first': True} if reverse else {'nulls_last': True}
+        key = F(self.field).desc(**options) if descending else F(self.field).asc(**options)
+        return [key, '-pk' if descending else 'pk']
+
+    def _after(self, value, pk):
+        op = 'lt' if self.descending else 'gt'
+        if value is None:
+            return Q(**{f'{self.field}__isnull': True, f'pk__{op}': pk})
+        condition = Q(**{f'{self.field}__{op}': value}) | Q(**{self.field: value, f'pk__{op}': pk})
+        if self.nullable:
+            condition |= Q(**{f'{self.field}__isnull': True})
+        return condition
+
+    def _before(self, value, pk):
+        op = 'gt' if self.descending else 'lt'
+        if value is None:
+            return Q(**{f'{self.field}__isnull': False}) | Q(**{f'{self.field}__isnull': True, f'pk__{op}': pk})
+        return Q(**{f'{self.field}__{op}': value}) | Q(**{self.field: value, f'pk__{op}': pk})
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            return data['v'], int(data['p']), bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def coerce_cursor_value(self, queryset, value):
+        """
+        Converts the decoded sort key value to the type of the sort column. 
+        Tampered cursors with a value of the wrong type are rejected like 
+        malformed ones instead of failing in the query.
+        """
+        if value is None:
+            return None
+        try:
+            return queryset.model._meta.get_field(self.field).to_python(value)
+        except (DjangoValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse=False):
+        data = {'v': getattr(obj, self.field), 'p': obj.pk}
+        if reverse:
+            data['r'] = 1
+        raw = json.dumps(data, default=_encode_value, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.base_url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    """
+    Standard pagination class to limit the number of offers returned per request.
+    Allows clients to set custom page sizes up to a maximum of 1000 items.
+    Clients can opt into keyset pagination with ?pagination=cursor, which
+    skips the COUNT query and avoids OFFSET scans on deep pages.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.is_cursor_request(request):
+            return self.get_keyset().paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async variant of paginate_queryset() for async views. The count and 
+        the page rows are read with the async ORM.
+        """
+        self.keyset = None
+        if self.keyset_class.is_cursor_request(request):
+            return await self.get_keyset().apaginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached property, so the async count is stored in its place.
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = await aload(self.page.object_list)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def get_keyset(self):
+        self.keyset = self.keyset_class()
+        self.keyset.page_size = self.page_size
+        self.keyset.max_page_size = self.max_page_size
+        return self.keyset
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,47 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class _AssertMaxQueriesContext(CaptureQueriesContext):
+    """
+    Captures all queries executed inside the block and fails the owning 
+    test case if more than the allowed number of queries were run.
+    """
+    def __init__(self, test_case, budget, connection):
+        self.test_case = test_case
+        self.budget = budget
+        super().__init__(connection)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return
+        executed = len(self)
+        if executed > self.budget:
+            queries = "\n".join(
+                f"{i}. {query['sql']}" for i, query in enumerate(self.captured_queries, start=1)
+            )
+            self.test_case.fail(
+                f"{executed} queries executed, budget is {self.budget}\nCaptured queries were:\n{queries}"
+            )
+
+
+class QueryBudgetMixin:
+    """
+    Test case mixin for enforcing query budgets on API endpoints.
+
+    Unlike assertNumQueries, a budget is an upper bound: endpoints may get 
+    cheaper without breaking the test, but any regression that adds 
+    per-row queries (N+1) makes the test fail and prints the captured SQL.
+    """
+
+    def assertMaxQueries(self, budget, using=DEFAULT_DB_ALIAS):
+        return _AssertMaxQueriesContext(self, budget, connections[using])
+
+    def assertWithinBudget(self, budget, func, *args, **kwargs):
+        """
+        Calls func with the given arguments inside a budget check 
+        and returns its result.
+        """
+        with self.assertMaxQueries(budget):
+            return func(*args, **kwargs)
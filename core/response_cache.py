@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+_MISSING = object()
+
+
+class VersionedResponseCache:
+    """
+    Server-side cache for response data of public, user independent endpoints.
+
+    Entries are keyed on the normalized query string plus a version counter
+    that lives in the same cache backend. Writes that change the underlying
+    data call bump(), which moves every reader to a fresh key space; old
+    entries simply expire. The backend is any Django cache alias
+    (RESPONSE_CACHE_ALIAS), so local memory works for a single process and a
+    file or database cache shares entries and versions between workers.
+
+    Concurrent misses for the same key are coalesced: threads of one process
+    wait on a striped lock, and across processes only the holder of a short
+    lived cache lock computes the value while the others poll for it.
+    """
+    lock_stripes = 64
+
+    def __init__(self, namespace, timeout=None, lock_timeout=10, wait_timeout=2.0, poll_interval=0.05):
+        self.namespace = namespace
+        self._timeout = timeout
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._locks = [threading.Lock() for _ in range(self.lock_stripes)]
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+    @property
+    def timeout(self):
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+    @property
+    def version_key(self):
+        return f'{self.namespace}:version'
+
+    def get_version(self):
+        """
+        Returns the current version. A missing counter is seeded from the
+        clock, so an evicted counter never falls back to an old version.
+        """
+        version = self.cache.get(self.version_key)
+        if version is None:
+            self.cache.add(self.version_key, int(time.time() * 1000), timeout=None)
+            version = self.cache.get(self.version_key)
+        return version
+
+    async def aget_version(self):
+        version = await self.cache.aget(self.version_key)
+        if version is None:
+            await self.cache.aadd(self.version_key, int(time.time() * 1000), timeout=None)
+            version = await self.cache.aget(self.version_key)
+        return version
+
+    def bump(self):
+        """
+        Invalidates all cached entries of the namespace. Called right away
+        and once more after the surrounding transaction commits, so a reader
+        that cached pre-commit data in between is invalidated as well.
+        """
+        self._bump()
+        transaction.on_commit(self._bump)
+
+    def _bump(self):
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:
+            self.cache.add(self.version_key, int(time.time() * 1000), timeout=None)
+
+    def make_key(self, request):
+        """
+        Builds the cache key from host, path and the query parameters.
+        Parameter order and empty values do not produce separate entries.
+        """
+        return f'{self.namespace}:{self.get_version()}:{self._digest(request)}'
+
+    async def amake_key(self, request):
+        return f'{self.namespace}:{await self.aget_version()}:{self._digest(request)}'
+
+    def _digest(self, request):
+        params = sorted(
+            (name, sorted(value for value in values if value != ''))
+            for name, values in request.query_params.lists()
+            if any(value != '' for value in values)
+        )
+        raw = f'{request.scheme}://{request.get_host()}{request.path}?{params!r}'
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get_or_set(self, key, producer):
+        """
+        Returns the cached value for key, computing it with producer on a miss.
+        """
+        value = self.cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._locks[hash(key) % self.lock_stripes]:
+            value = self.cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+            lock_key = f'{key}:lock'
+            if self.cache.add(lock_key, 1, timeout=self.lock_timeout):
+                try:
+                    value = producer()
+                    self.cache.set(key, value, timeout=self.timeout)
+                    return value
+                finally:
+                    self.cache.delete(lock_key)
+
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                value = self.cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    return value
+
+        return producer()
+
+    async def aget_or_set(self, key, producer):
+        """
+        Async variant of get_or_set(); producer is a coroutine function. 
+        Concurrent misses are coalesced through the cache lock only, since 
+        waiting coroutines must not block the event loop on a thread lock.
+        """
+        value = await self.cache.aget(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        lock_key = f'{key}:lock'
+        if await self.cache.aadd(lock_key, 1, timeout=self.lock_timeout):
+            try:
+                value = await producer()
+                await self.cache.aset(key, value, timeout=self.timeout)
+                return value
+            finally:
+                await self.cache.adelete(lock_key)
+
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            value = await self.cache.aget(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+        return await producer()
+
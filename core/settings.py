@@ -108,12 +108,81 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+
+# Image variants
+# Resized copies of uploaded offer and profile images, generated after the
+# upload on a background thread pool (see core/images.py). Requires Pillow.
+
+IMAGE_VARIANTS = {
+    'thumbnail': (320, 320),
+    'medium': (960, 960),
+}
+IMAGE_WORKER_THREADS = 2
+
+# Cache
+# LocMemCache is per process. Use a shared backend when running several workers,
+# e.g. django.core.cache.backends.filebased.FileBasedCache or
+# django.core.cache.backends.db.DatabaseCache (python manage.py createcachetable).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Shared by all worker processes; create the table with 'createcachetable'.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'coderr_shared_cache',
+    },
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Events
+# Order events for the streaming endpoint (see core/events.py). The in-process
+# backend only reaches clients of the same worker process. Under WSGI every
+# request is a short poll that holds its thread for EVENTS_WSGI_POLL_SECONDS.
+
+EVENTS_BACKEND = 'core.events.InProcessBackend'
+EVENTS_HEARTBEAT_SECONDS = 15
+EVENTS_WSGI_POLL_SECONDS = 1
+
+# Async read endpoints
+# Viewsets using core.async_views.AsyncReadMixin answer their read actions with
+# coroutines under ASGI. Set to False to serve them with the sync views again.
+
+ASYNC_READ_VIEWS = True
+
+# Platform statistics
+# /api/base-info/ is answered from a per-process snapshot of the maintained
+# counters (see base_info_app/snapshot.py). It is refreshed after MAX_AGE
+# seconds, and the counters are recounted from the tables once they are older
+# than RECONCILE_SECONDS.
+
+BASE_INFO_MAX_AGE = 5
+BASE_INFO_RECONCILE_SECONDS = 3600
+
+# Token authentication
+# Tokens and some fields of their users are cached per process (see
+# core/authentication.py). Logouts and user changes are announced through the
+# cache alias below, which must be shared between workers; a local-memory
+# alias or None disables the token cache. Each process checks for
+# announcements at most every REVOCATION_POLL_SECONDS.
+
+AUTH_TOKEN_CACHE_ALIAS = 'shared'
+AUTH_TOKEN_CACHE_SIZE = 10000
+AUTH_TOKEN_CACHE_TTL = 60
+AUTH_TOKEN_REVOCATION_POLL_SECONDS = 1
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "core.authentication.CachedTokenAuthentication",
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
      'DATETIME_FORMAT': "%Y-%m-%dT%H:%M:%S.%fZ",
@@ -1,8 +1,14 @@
 from rest_framework import serializers
 from offers_app.models import Offer, OfferDetail
-from django.db.models import Max, Min
+from django.contrib.auth import get_user_model
+from django.db import transaction
 
-from reviews_app.tests import User
+from base_info_app.models import PlatformCounts
+from base_info_app.snapshot import platform_snapshot
+from core.images import ImageVariantsField, needs_variants, schedule_variants
+from reviews_app.api.serializers import UserRatingField
+
+User = get_user_model()
 
 
 class OfferDetailSerializer(serializers.ModelSerializer):
@@ -31,6 +37,44 @@ class OfferDetailCreateSerializer(serializers.ModelSerializer):
         model = OfferDetail
         fields = ["id", "title", "revisions", "delivery_time_in_days", "price", "features", "offer_type"]        
 
+def create_offers(user, items):
+    """
+    Creates offers together with their nested detail tiers in one transaction.
+    Offers and details are each inserted with a single bulk INSERT; the 
+    denormalized minimum values are then recalculated once for all offers 
+    by OfferDetail.objects.bulk_create. Bulk inserts skip post_save, so the
+    effects of its receivers are applied explicitly: the cached offer list
+    is invalidated by Offer.objects.bulk_create, the platform offer count
+    and snapshot are updated in the same transaction and image variants are
+    scheduled here.
+    """
+    with transaction.atomic():
+        offers = Offer.objects.bulk_create([
+            Offer(user=user, **{key: value for key, value in item.items() if key != 'details'})
+            for item in items
+        ])
+        tiers = [[OfferDetail(offer=offer, **data) for data in item['details']] for offer, item in zip(offers, items)]
+        OfferDetail.objects.bulk_create([detail for offer_tiers in tiers for detail in offer_tiers])
+        PlatformCounts.objects.add(offer_count=len(offers))
+        platform_snapshot.invalidate()
+
+    for offer, offer_tiers in zip(offers, tiers):
+        offer._prefetched_objects_cache = {'details': offer_tiers}
+        if needs_variants(offer, 'image'):
+            schedule_variants(offer, 'image')
+    return offers
+
+
+class OfferListSerializer(serializers.ListSerializer):
+    """
+    List serializer used when several offers are posted in one request, 
+    e.g. by business users migrating an existing catalog.
+    """
+
+    def create(self, validated_data):
+        return create_offers(self.context['request'].user, validated_data)
+
+
 class OfferSerializer(serializers.ModelSerializer):
     """
     Custom create method to handle nested OfferDetail objects.
@@ -43,16 +87,11 @@ class OfferSerializer(serializers.ModelSerializer):
     class Meta:
         model = Offer
         fields = ["id", "title", "image", "description", "details"]
+        list_serializer_class = OfferListSerializer
 
     def create(self, validated_data):
         user = self.context['request'].user        
-        details_list = validated_data.pop('details')    
-        offer = Offer.objects.create(user=user, **validated_data)
-
-        for item in details_list:
-            OfferDetail.objects.create(offer=offer, **item)
-            
-        return offer
+        return create_offers(user, [validated_data])[0]
 
 
 class OfferDetailLinkSerializer(serializers.ModelSerializer):
@@ -82,13 +121,16 @@ class OfferUserDetailSerializer(serializers.ModelSerializer):
 class OfferReadSerializer(serializers.ModelSerializer):
     """
     Serializer for list views of offers.
-    Provides calculated fields for minimum price and minimum delivery time 
-    while linking to detail tiers via URLs.
+    Exposes the denormalized minimum price and minimum delivery time 
+    stored on the offer while linking to detail tiers via URLs. 
+    The owner's rating comes from the joined review statistics.
     """
     details = OfferDetailLinkSerializer(many=True, read_only=True)
     min_price = serializers.SerializerMethodField()
     min_delivery_time = serializers.SerializerMethodField()
     user_details = OfferUserDetailSerializer(source="user", read_only=True)
+    user_rating = UserRatingField(source="user")
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Offer
@@ -97,45 +139,45 @@ class OfferReadSerializer(serializers.ModelSerializer):
             "user",
             "title",
             "image",
+            "image_variants",
             "description",
             "created_at",
             "updated_at",
             "details",
             "min_price",
             "min_delivery_time",
-            "user_details"            
+            "user_details",
+            "user_rating",
         ]
         read_only_fields = ["min_price", "min_delivery_time"]
   
     def get_min_price(self, obj): 
-        from django.db.models import Min
-        return obj.details.aggregate(Min('price'))['price__min'] or 0
+        return obj.min_price or 0
 
     def get_min_delivery_time(self, obj):
-        from django.db.models import Min
-        return obj.details.aggregate(Min('delivery_time_in_days'))['delivery_time_in_days__min'] or 0
+        return obj.min_delivery_time or 0
     
 class OfferSingleReadSerializer(serializers.ModelSerializer):
     """
     Serializer for the detailed retrieval of a single offer.
-    Returns comprehensive information including the associated owner 
-    and timestamps.
+    Returns comprehensive information including the associated owner, 
+    the owner's rating statistics and timestamps.
     """
     details = OfferDetailLinkSerializer(many=True, read_only=True)
     min_price = serializers.SerializerMethodField()
     min_delivery_time = serializers.SerializerMethodField()
+    user_rating = UserRatingField(source="user")
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Offer
-        fields = ["id", "user", "title", "image", "description", "created_at",  "updated_at", "details", "min_price", "min_delivery_time"]
+        fields = ["id", "user", "title", "image", "image_variants", "description", "created_at",  "updated_at", "details", "min_price", "min_delivery_time", "user_rating"]
 
     def get_min_price(self, obj): 
-        from django.db.models import Min
-        return obj.details.aggregate(Min('price'))['price__min'] or 0
+        return obj.min_price or 0
 
     def get_min_delivery_time(self, obj):
-        from django.db.models import Min
-        return obj.details.aggregate(Min('delivery_time_in_days'))['delivery_time_in_days__min'] or 0    
+        return obj.min_delivery_time or 0    
 
 
 
@@ -162,8 +204,41 @@ class OfferUpdateSerializer(serializers.ModelSerializer):
         return data
 
     def update(self, instance, validated_data):
+        """
+        Applies the offer fields and all tier changes in one transaction.
+        The tiers are loaded once, changed in memory and written back with 
+        a single bulk UPDATE, after which the denormalized minimum values 
+        are recalculated once. The updated tiers are kept on the instance 
+        so the response does not query them again.
+        """
         details_data = validated_data.pop('details', [])
-        instance = super().update(instance, validated_data)        
-        for data in details_data:
-            instance.details.filter(offer_type=data.get('offer_type')).update(**data)
-        return instance
\ No newline at end of file
+        changes = {data['offer_type']: data for data in details_data}
+
+        with transaction.atomic():
+            if validated_data:
+                instance = super().update(instance, validated_data)
+            tiers = list(instance.details.order_by('id'))
+            changed, fields = [], set()
+            for tier in tiers:
+                data = changes.get(tier.offer_type)
+                if not data:
+                    continue
+                for field, value in data.items():
+                    setattr(tier, field, value)
+                fields.update(data)
+                changed.append(tier)
+            if changed:
+                OfferDetail.objects.bulk_update(changed, sorted(fields))
+
+        instance._updated_tiers = tiers
+        return instance
+
+    def to_representation(self, instance):
+        """
+        Reuses the tiers written by update(). DRF clears the prefetch cache 
+        after saving, so they are attached here right before serializing.
+        """
+        tiers = getattr(instance, '_updated_tiers', None)
+        if tiers is not None:
+            instance._prefetched_objects_cache = {'details': tiers}
+        return super().to_representation(instance)
\ No newline at end of file
@@ -1,49 +1,82 @@
 import django_filters
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
 from offers_app.api.permissions import IsOwnOffer, IsBusinessUser
 from offers_app.api.serializer import OfferDetailSerializer, OfferSerializer, OfferReadSerializer, OfferSingleReadSerializer, OfferUpdateSerializer
 from offers_app.models import Offer, OfferDetail
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
+from core.pagination import StandardResultsSetPagination
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import AllowAny
-
-class StandardResultsSetPagination(PageNumberPagination):
-    """
-    Standard pagination class to limit the number of offers returned per request.
-    Allows clients to set custom page sizes up to a maximum of 1000 items.
-    """
-    page_size = 10
-    page_size_query_param = 'page_size' 
-    max_page_size = 1000
+from django.db.models import Exists, OuterRef, Prefetch
+from rest_framework.settings import api_settings
+from offers_app.search import search_offers
+from offers_app.cache import offer_list_cache
+from reviews_app.api.serializers import USER_RATING_VALIDATOR_FIELDS
+from rest_framework.response import Response
+from core.async_views import AsyncReadMixin, aload
+from core.conditional import ConditionalGetMixin
 
 class OfferFilter(django_filters.FilterSet):
     """
     Custom filter set for the Offer model.
     Allows filtering by the creator's user ID, a minimum price threshold, 
     and a maximum delivery time limit across nested offer details.
+    Neither filter joins the detail table: the delivery time uses the 
+    denormalized 'min_delivery_time' column and the price an EXISTS subquery, 
+    so no duplicate rows are produced and no DISTINCT is needed.
     """
-    creator_id = django_filters.NumberFilter(field_name='user__id')
-    min_price = django_filters.NumberFilter(field_name='details__price', lookup_expr='gte') 
-    max_delivery_time = django_filters.NumberFilter(field_name='details__delivery_time_in_days', lookup_expr='lte')
+    creator_id = django_filters.NumberFilter(field_name='user_id')
+    min_price = django_filters.NumberFilter(method='filter_min_price') 
+    max_delivery_time = django_filters.NumberFilter(field_name='min_delivery_time', lookup_expr='lte')
 
     class Meta:
         model = Offer
         fields = ['creator_id', 'min_price', 'max_delivery_time']
 
+    def filter_min_price(self, queryset, name, value):
+        """
+        Keeps offers with at least one detail tier priced at or above the value.
+        """
+        tiers = OfferDetail.objects.filter(offer=OuterRef('pk'), price__gte=value)
+        return queryset.filter(Exists(tiers))
+
 
-class OffersViewSet(viewsets.ModelViewSet):
+class OfferSearchFilter(filters.SearchFilter):
+    """
+    Search backend for offers that answers the 'search' parameter from the 
+    full-text index instead of LIKE scans. Every term is matched as a prefix 
+    and results are ordered by relevance unless an explicit ordering was 
+    requested. Falls back to the default SearchFilter if no index is available.
+    """
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        ranked = not request.query_params.get(api_settings.ORDERING_PARAM)
+        searched = search_offers(queryset, terms, ranked=ranked)
+        if searched is None:
+            return super().filter_queryset(request, queryset, view)
+        return searched
+
+
+class OffersViewSet(ConditionalGetMixin, AsyncReadMixin, viewsets.ModelViewSet):
     """
     Main ViewSet for handling service offers.
     Provides full CRUD functionality with dynamic serializer switching based on the action,
     integrated search, filtering, and custom permission handling.
+    List and retrieve are served as coroutines (see AsyncReadMixin).
     """
     queryset = Offer.objects.all()
     serializer_class = OfferSerializer
     pagination_class = StandardResultsSetPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OfferSearchFilter, filters.OrderingFilter]
     filterset_class = OfferFilter
     search_fields = ['title', 'description']
+    ordering_fields = ['id', 'title', 'created_at', 'updated_at', 'min_price', 'min_delivery_time']
+    cursor_ordering_fields = ['updated_at', 'min_price']
+    cursor_default_ordering = '-updated_at'
+    validator_fields = USER_RATING_VALIDATOR_FIELDS
+    max_bulk_create = 100
 
 
     def get_serializer_class(self):
@@ -87,20 +120,73 @@ class OffersViewSet(viewsets.ModelViewSet):
         return super().get_authenticators()
         
     
+    def create(self, request, *args, **kwargs):
+        """
+        Creates a single offer, or several offers at once when the request 
+        body is a list. Bulk requests are limited to 'max_bulk_create' offers.
+        """
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data, many=True, max_length=self.max_bulk_create)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Serves the offer list from the versioned response cache. 
+        List requests are never authenticated, so the response only depends 
+        on the query string and is shared by all clients. The cache key 
+        doubles as collection ETag, so revalidation needs no query at all.
+        """
+        key = offer_list_cache.make_key(request)
+        return self.conditional_response(
+            (self.build_etag(key), None),
+            lambda: Response(offer_list_cache.get_or_set(key, lambda: self.get_list_data(request))),
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        key = await offer_list_cache.amake_key(request)
+
+        async def respond():
+            return Response(await offer_list_cache.aget_or_set(key, lambda: self.aget_list_data(request)))
+
+        return await self.aconditional_response((self.build_etag(key), None), respond)
+
+    def get_list_data(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data).data
+        return self.get_serializer(queryset, many=True).data
+
+    async def aget_list_data(self, request):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data).data
+        return self.get_serializer(await aload(queryset), many=True).data
+
     def get_queryset(self):
         """
         Returns the queryset for the view.
-        Applies 'distinct()' to prevent duplicate results when filtering over 
-        related offer detail tiers.
+        Read actions join the owner with its rating statistics and prefetch 
+        the detail links so the query count does not grow with the page size.
         """
-        return Offer.objects.all().distinct()
+        queryset = Offer.objects.all()
+        if self.action in ["list", "retrieve"]:
+            queryset = queryset.select_related("user__review_stats").prefetch_related(
+                Prefetch("details", queryset=OfferDetail.objects.only("id", "offer_id").order_by("id"))
+            )
+        return queryset
     
 
-class OffersDetailViewset(viewsets.ModelViewSet):
+class OffersDetailViewset(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for accessing specific pricing tiers (OfferDetails) directly.
     Provides standard model operations for detailed service configurations.
     """
-    queryset = OfferDetail.objects.all()  
+    queryset = OfferDetail.objects.select_related('offer')
     serializer_class = OfferDetailSerializer
+    last_modified_field = 'offer__updated_at'
     
\ No newline at end of file
@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class OfferAppConfig(AppConfig):
     name = 'offers_app'
+
+    def ready(self):
+        """
+        Installs the full-text search index after migrations ran, 
+        because it is not part of the model state.
+        """
+        from offers_app.search import install_search_index
+        post_migrate.connect(install_search_index, sender=self)
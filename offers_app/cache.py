@@ -0,0 +1,8 @@
+"""
+Response cache for the anonymous offer list. Its version is bumped by every 
+write to Offer or OfferDetail, see offers_app.models.
+"""
+from core.response_cache import VersionedResponseCache
+
+
+offer_list_cache = VersionedResponseCache('offers-list')
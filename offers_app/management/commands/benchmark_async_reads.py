@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from rest_framework.authtoken.models import Token
+
+from offers_app.models import Offer, OfferDetail
+from reviews_app.models import Reviews
+
+
+class Command(BaseCommand):
+    """
+    Compares the throughput of the sync and async implementations of the
+    read endpoints at a given concurrency. Requests are dispatched in process
+    the way the ASGI handler does it: sync views through sync_to_async, async
+    views awaited directly. The offer list cache is bypassed with a unique
+    query parameter per request. The seeded rows are deleted afterwards.
+    """
+    help = "Benchmarks the sync against the async read endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--offers', type=int, default=50)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        business = User.objects.create_user(username='bench-async-business', type='business')
+        customer = User.objects.create_user(username='bench-async-customer', type='customer')
+        try:
+            self.seed(business, customer, options['offers'])
+            token = Token.objects.create(user=customer)
+            offer = Offer.objects.filter(user=business).first()
+            endpoints = {
+                'offer list': reverse('offers-list'),
+                'offer retrieve': reverse('offers-detail', kwargs={'pk': offer.pk}),
+                'profile retrieve': reverse('profile-detail', kwargs={'pk': business.pk}),
+                'base info': reverse('base-info-list'),
+                'review list': reverse('reviews-list'),
+            }
+            for name, path in endpoints.items():
+                results = [
+                    asyncio.run(self.measure(path, token.key, mode, options['requests'], options['concurrency']))
+                    for mode in ('sync', 'async')
+                ]
+                self.stdout.write(
+                    f"{name:<17} sync {results[0]:8.1f} req/s   async {results[1]:8.1f} req/s"
+                )
+        finally:
+            business.delete()
+            customer.delete()
+
+    def seed(self, business, customer, count):
+        offers = Offer.objects.bulk_create([
+            Offer(user=business, title=f'Benchmark {i}', description='Async read benchmark') for i in range(count)
+        ])
+        OfferDetail.objects.bulk_create([
+            OfferDetail(
+                offer=offer, title=tier, price=10, offer_type=tier,
+                revisions=1, delivery_time_in_days=1, features=[],
+            )
+            for offer in offers for tier in ('basic', 'standard', 'premium')
+        ])
+        Reviews.objects.create(business_user=business, reviewer=customer, rating=5, description='Benchmark')
+
+    async def measure(self, path, key, mode, total, concurrency):
+        view = resolve(path)
+        factory = RequestFactory(HTTP_HOST='localhost')
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(i):
+            request = factory.get(path, {'bench': i}, HTTP_AUTHORIZATION=f'Token {key}')
+            async with semaphore:
+                if mode == 'sync':
+                    response = await sync_to_async(view.func.sync_view)(request, *view.args, **view.kwargs)
+                else:
+                    response = await view.func(request, *view.args, **view.kwargs)
+                response.render()
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} answered {response.status_code}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(call(i) for i in range(total)))
+        return total / (time.perf_counter() - start)
@@ -1,16 +1,61 @@
 from django.db import models
+from django.db.models import Min, OuterRef, Subquery
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.conf import settings
+from django.utils import timezone
+
+from core.images import needs_variants, schedule_variants
+from offers_app.cache import offer_list_cache
+
+
+class OfferQuerySet(models.QuerySet):
+    """
+    QuerySet for offers that knows how to recompute the denormalized
+    minimum price and minimum delivery time from the related detail tiers.
+    Bulk writes invalidate the cached offer list.
+    """
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        offer_list_cache.bump()
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        offer_list_cache.bump()
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        offer_list_cache.bump()
+        return rows
+
+    def refresh_min_values(self):
+        """
+        Recalculates 'min_price' and 'min_delivery_time' for every offer in
+        the queryset with a single UPDATE using correlated subqueries.
+        Offers without any detail tiers end up with NULL values.
+        """
+        details = OfferDetail.objects.filter(offer=OuterRef('pk')).order_by().values('offer')
+        return self.update(
+            min_price=Subquery(details.annotate(value=Min('price')).values('value')),
+            min_delivery_time=Subquery(details.annotate(value=Min('delivery_time_in_days')).values('value')),
+            updated_at=timezone.now(),
+        )
   
 
 class Offer(models.Model):
     """
     Represents a service offer created by a business user.
     Stores general information such as title, description, and an optional image.
-    Maintains denormalized fields for minimum price and delivery time for performance.
+    Maintains denormalized fields for minimum price and delivery time for performance,
+    and the storage names of the resized image variants generated in the background.
     """
     title = models.CharField(max_length=100)
     description = models.TextField()
     image = models.FileField(upload_to='offer_images/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     min_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     min_delivery_time = models.IntegerField(blank=True, null=True)  
     created_at = models.DateTimeField(auto_now_add=True)
@@ -22,12 +67,93 @@ class Offer(models.Model):
         help_text="User who owns and created the owned_offer."
     )
 
+    objects = OfferQuerySet.as_manager()
+
+    class Meta:
+        """
+        Indexes backing the keyset pagination sort keys and the list filters, 
+        alone and combined with the creator.
+        """
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='offer_updated_at_id_idx'),
+            models.Index(fields=['min_price', 'id'], name='offer_min_price_id_idx'),
+            models.Index(fields=['min_delivery_time', 'id'], name='offer_min_delivery_id_idx'),
+            models.Index(fields=['user', 'updated_at', 'id'], name='offer_user_updated_at_idx'),
+            models.Index(fields=['user', 'min_price', 'id'], name='offer_user_min_price_idx'),
+            models.Index(fields=['user', 'min_delivery_time'], name='offer_user_min_delivery_idx'),
+        ]
+
+
+class OfferSearchEntry(models.Model):
+    """
+    Row of the SQLite FTS5 index over the offer titles and descriptions.
+    The virtual table is created and kept in sync outside of the migrations
+    (see offers_app.search); the model only lets offer querysets join it
+    once through 'search_entry', match it and order by its rank.
+    """
+    offer = models.OneToOneField(
+        Offer,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_entry',
+    )
+    # Hidden FTS5 column named after the table, the left operand of MATCH.
+    document = models.TextField(db_column='offers_app_offer_fts')
+    # Hidden FTS5 column holding the configured bm25() score, lower is better.
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'offers_app_offer_fts'
+
+
+class OfferDetailQuerySet(models.QuerySet):
+    """
+    QuerySet for offer detail tiers.
+    Bulk write paths bypass OfferDetail.save(), so they are overridden here 
+    to keep the parent offers' minimum price, delivery time and 'updated_at' 
+    in sync. Each override recalculates the affected offers with one UPDATE.
+    """
+
+    _refresh_offers = True
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._refresh_offers = self._refresh_offers
+        return clone
+
+    def update(self, **kwargs):
+        if not self._refresh_offers:
+            return super().update(**kwargs)
+        offer_ids = set(self.values_list('offer_id', flat=True))
+        rows = super().update(**kwargs)
+        new_offer = kwargs.get('offer', kwargs.get('offer_id'))
+        if new_offer is not None:
+            offer_ids.add(getattr(new_offer, 'pk', new_offer))
+        Offer.objects.filter(pk__in=offer_ids).refresh_min_values()
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        Offer.objects.filter(pk__in={obj.offer_id for obj in created}).refresh_min_values()
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        # bulk_update() runs update() internally, the offers are refreshed once below.
+        queryset = self._clone()
+        queryset._refresh_offers = False
+        rows = super(OfferDetailQuerySet, queryset).bulk_update(objs, fields, *args, **kwargs)
+        Offer.objects.filter(pk__in={obj.offer_id for obj in objs}).refresh_min_values()
+        return rows
+
   
 class OfferDetail(models.Model):
     """
     Represents a specific pricing tier for an Offer (Basic, Standard, or Premium).
     Contains details regarding revisions, delivery time, price, and specific features.
-    Automatically updates the parent Offer's minimum price upon saving.
+    Automatically updates the parent Offer's minimum price and delivery time upon saving.
     """
         
     class OfferType(models.TextChoices):
@@ -54,11 +180,67 @@ class OfferDetail(models.Model):
         default=OfferType.BASIC,
     )
 
+    objects = OfferDetailQuerySet.as_manager()
+
+    class Meta:
+        """
+        Index for the price EXISTS probe of the offer list filter.
+        """
+        indexes = [
+            models.Index(fields=['offer', 'price'], name='offerdetail_offer_price_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         """
         Custom save method to recalculate the parent Offer's minimum price 
-        whenever a detail tier is created or updated.
+        and minimum delivery time whenever a detail tier is created or updated.
         """
         super().save(*args, **kwargs)
-        self.offer.min_price = self.offer.details.aggregate(models.Min('price'))['price__min'] or 0
-        self.offer.save()
\ No newline at end of file
+        Offer.objects.filter(pk=self.offer_id).refresh_min_values()
+
+
+@receiver(post_delete, sender=OfferDetail)
+def refresh_offer_min_values_on_detail_delete(sender, instance, origin=None, **kwargs):
+    """
+    Signal receiver that keeps the parent Offer's minimum values correct 
+    after a detail tier was removed. Skipped when the deletion is a cascade 
+    from the offer itself, since the offer row is gone as well.
+    """
+    if isinstance(origin, Offer) or getattr(origin, 'model', None) is Offer:
+        return
+    Offer.objects.filter(pk=instance.offer_id).refresh_min_values()
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def invalidate_offer_list_cache(sender, **kwargs):
+    """
+    Signal receiver that invalidates the cached offer list whenever a single 
+    offer or detail tier is created, changed or deleted.
+    """
+    offer_list_cache.bump()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_offer_list_cache_on_owner_change(sender, instance, update_fields=None, **kwargs):
+    """
+    The offer list shows the owner's names, so renaming a business user 
+    invalidates it as well. Saves that only touch other columns, such as 
+    'last_login' on login, are ignored.
+    """
+    if instance.type != 'business':
+        return
+    if update_fields is None or {'username', 'first_name', 'last_name'}.intersection(update_fields):
+        offer_list_cache.bump()
+
+
+@receiver(post_save, sender=Offer)
+def schedule_offer_image_variants(sender, instance, **kwargs):
+    """
+    Signal receiver that queues the generation of resized variants 
+    whenever a new image was stored for the offer.
+    """
+    if needs_variants(instance, 'image'):
+        schedule_variants(instance, 'image')
@@ -0,0 +1,151 @@
+"""
+Full-text search index for offers.
+
+On SQLite an external-content FTS5 table mirrors the title and description
+of every offer and is kept in sync by triggers, so queryset updates and raw
+writes are covered as well. On PostgreSQL a GIN expression index over the
+tsvector of both columns is used, which the database keeps up to date by
+itself. Other engines fall back to DRF's LIKE based search.
+"""
+
+import re
+
+from django.db import connections, router
+from django.db.models import BooleanField, F, Lookup
+from django.db.models.expressions import RawSQL
+from django.db.utils import DatabaseError
+
+from offers_app.models import Offer, OfferSearchEntry
+
+
+FTS_TABLE = OfferSearchEntry._meta.db_table
+PG_INDEX = 'offers_app_offer_search_idx'
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+_available = {}
+
+
+class Match(Lookup):
+    """FTS5 MATCH of the index against a query string."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+OfferSearchEntry._meta.get_field('document').register_lookup(Match)
+
+
+def _offer_table(connection):
+    return connection.ops.quote_name(Offer._meta.db_table)
+
+
+def _pg_vector(connection):
+    table = _offer_table(connection)
+    return (
+        f"setweight(to_tsvector('simple', coalesce({table}.\"title\", '')), 'A') || "
+        f"setweight(to_tsvector('simple', coalesce({table}.\"description\", '')), 'D')"
+    )
+
+
+def _sqlite_statements(connection):
+    table = _offer_table(connection)
+    return [
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        f"title, description, content={table}, content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) "
+        f"VALUES ('delete', old.id, old.title, old.description); END",
+        f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF title, description ON {table} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) "
+        f"VALUES ('delete', old.id, old.title, old.description); "
+        f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ]
+
+
+def _sqlite_rank_statement():
+    # The rank column scores with bm25(); title hits weigh ten times more.
+    return f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')"
+
+
+def install_search_index(using='default', **kwargs):
+    """
+    Creates the engine specific full-text index if it does not exist yet.
+    Connected to post_migrate, since the index lives outside of the model state.
+    """
+    connection = connections[using]
+    _available.pop(connection.settings_dict['NAME'], None)
+    if connection.vendor == 'sqlite':
+        statements = [_sqlite_rank_statement()]
+        if FTS_TABLE not in connection.introspection.table_names():
+            statements = _sqlite_statements(connection) + statements
+        try:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+        except DatabaseError:
+            # SQLite was built without FTS5, searches keep using LIKE.
+            return
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON {_offer_table(connection)} "
+                f"USING GIN (({_pg_vector(connection)}))"
+            )
+
+
+def is_available(connection):
+    """
+    Returns True if the full-text index can be used on this connection.
+    The result is cached per database.
+    """
+    name = connection.settings_dict['NAME']
+    if name not in _available:
+        if connection.vendor == 'sqlite':
+            _available[name] = FTS_TABLE in connection.introspection.table_names()
+        else:
+            _available[name] = connection.vendor == 'postgresql'
+    return _available[name]
+
+
+def tokenize(terms):
+    """
+    Splits the raw search terms into plain word tokens, dropping any
+    characters that would be interpreted as query syntax.
+    """
+    return [token for term in terms for token in TOKEN_PATTERN.findall(term)]
+
+
+def search_offers(queryset, terms, ranked=True):
+    """
+    Restricts the offer queryset to rows matching all terms, each one as a
+    prefix. When ranked is set, the best matches come first.
+    Returns None if no full-text index is available for the database.
+    """
+    connection = connections[router.db_for_read(Offer)]
+    tokens = tokenize(terms)
+    if not tokens or not is_available(connection):
+        return None
+
+    if connection.vendor == 'sqlite':
+        query = ' '.join(f'"{token}"*' for token in tokens)
+        # Joins the index once; the MATCH drives the join and yields the rank.
+        queryset = queryset.filter(search_entry__document__match=query)
+        rank = -F('search_entry__rank')
+    else:
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        vector = _pg_vector(connection)
+        queryset = queryset.filter(
+            RawSQL(f"({vector}) @@ to_tsquery('simple', %s)", (query,), output_field=BooleanField())
+        )
+        rank = RawSQL(f"ts_rank({vector}, to_tsquery('simple', %s))", (query,))
+
+    if ranked:
+        queryset = queryset.annotate(search_rank=rank).order_by('-search_rank', '-updated_at')
+    return queryset
@@ -1,11 +1,31 @@
-from django.urls import reverse
+import asyncio
+import base64
+import json
+import shutil
+import tempfile
+import threading
+from io import BytesIO
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
-from django.contrib.auth import get_user_model
+
+from core.images import Image, process_variants
+from core.query_budget import QueryBudgetMixin
+from offers_app.cache import offer_list_cache
+from reviews_app.models import Reviews
 from .models import Offer, OfferDetail
 
 User = get_user_model()
 
+
 class OfferAPITests(APITestCase):
 
     data = {
@@ -95,6 +115,37 @@ class OfferAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Offer.objects.count(), 2)
 
+    def _three_tier_payload(self, title="Three tiers"):
+        return {
+            "title": title,
+            "description": "Basic, standard and premium",
+            "details": [
+                dict(detail, title=detail["offer_type"], features=["Feature"])
+                for detail in self.data["details"]
+            ],
+        }
+
+    def test_create_offer_runs_fixed_number_of_queries(self):
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(6):
+            response = self.client.post(self.list_url, self._three_tier_payload(), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['details']), 3)
+
+        offer = Offer.objects.get(pk=response.data['id'])
+        self.assertEqual(float(offer.min_price), 10.00)
+        self.assertEqual(offer.min_delivery_time, 1)
+
+    def test_create_many_offers_in_one_request(self):
+        self.client.force_authenticate(user=self.user)
+        payload = [self._three_tier_payload(f"Bulk {i}") for i in range(3)]
+        response = self.client.post(self.list_url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item['title'] for item in response.data], ["Bulk 0", "Bulk 1", "Bulk 2"])
+        self.assertEqual(OfferDetail.objects.filter(offer__title__startswith="Bulk").count(), 9)
+        self.assertFalse(Offer.objects.filter(title__startswith="Bulk", min_price__isnull=True).exists())
+
     def test_create_offer_as_customer_denied(self):
         """Prüft, ob ein Customer am Erstellen gehindert wird (403)."""
         self.client.force_authenticate(user=self.customer_user)
@@ -117,6 +168,29 @@ class OfferAPITests(APITestCase):
         basic_detail = OfferDetail.objects.get(offer=self.offer, offer_type="basic")
         self.assertEqual(float(basic_detail.price), 120.00)
 
+    def test_partial_update_of_all_tiers_runs_fixed_number_of_queries(self):
+        self.client.force_authenticate(user=self.user)
+        data = {
+            "title": "Web Design Pro",
+            "details": [
+                {"offer_type": "basic", "price": "80.00", "title": "Basic+"},
+                {"offer_type": "premium", "price": "400.00", "delivery_time_in_days": 1},
+            ]
+        }
+        with self.assertNumQueries(7):
+            response = self.client.patch(self.detail_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(item['offer_type'], item['price']) for item in response.data['details']],
+            [("basic", "80.00"), ("premium", "400.00")],
+        )
+
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.title, "Web Design Pro")
+        self.assertEqual(float(self.offer.min_price), 80.00)
+        self.assertEqual(self.offer.min_delivery_time, 1)
+        self.assertEqual(OfferDetail.objects.get(offer=self.offer, offer_type="basic").title, "Basic+")
+
     def test_update_foreign_offer_denied(self):
         """Andere Business-User dürfen fremde Angebote nicht ändern."""
         self.client.force_authenticate(user=self.other_user)
@@ -130,9 +204,439 @@ class OfferAPITests(APITestCase):
         results = self._get_results_list(response)
         self.assertEqual(len(results), 1)
 
+    def test_filters_do_not_duplicate_offers(self):
+        url = f"{self.list_url}?min_price=50&max_delivery_time=20"
+        response = self.client.get(url)
+        results = self._get_results_list(response)
+        self.assertEqual([item['id'] for item in results], [self.offer.id])
+
+    def test_min_price_filter_matches_any_tier(self):
+        response = self.client.get(f"{self.list_url}?min_price=400")
+        self.assertEqual(len(self._get_results_list(response)), 1)
+
+        response = self.client.get(f"{self.list_url}?min_price=600")
+        self.assertEqual(len(self._get_results_list(response)), 0)
+
     def test_search_title(self):
         self.client.force_authenticate(user=self.user)
         url = f"{self.list_url}?search=Web"
         response = self.client.get(url)
         results = self._get_results_list(response)
-        self.assertEqual(len(results), 1)
\ No newline at end of file
+        self.assertEqual(len(results), 1)
+
+    def test_partial_update_refreshes_min_values(self):
+        self.client.force_authenticate(user=self.user)
+        data = {
+            "details": [{"offer_type": "premium", "price": "50.00", "delivery_time_in_days": 1}]
+        }
+        response = self.client.patch(self.detail_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.offer.refresh_from_db()
+        self.assertEqual(float(self.offer.min_price), 50.00)
+        self.assertEqual(self.offer.min_delivery_time, 1)
+
+    def test_detail_delete_refreshes_min_values(self):
+        OfferDetail.objects.get(offer=self.offer, offer_type="basic").delete()
+
+        self.offer.refresh_from_db()
+        self.assertEqual(float(self.offer.min_price), 500.00)
+        self.assertEqual(self.offer.min_delivery_time, 2)
+
+    def test_bulk_create_refreshes_min_values(self):
+        OfferDetail.objects.bulk_create([
+            OfferDetail(
+                offer=self.offer, title="Standard", revisions=3,
+                delivery_time_in_days=1, price=50.00, offer_type="standard", features={}
+            )
+        ])
+
+        self.offer.refresh_from_db()
+        self.assertEqual(float(self.offer.min_price), 50.00)
+        self.assertEqual(self.offer.min_delivery_time, 1)
+
+
+class OfferQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """Offer endpoints must run a fixed number of queries, independent of the page size."""
+
+    LIST_BUDGET = 3
+    RETRIEVE_BUDGET = 2
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'business{i}', type='business')
+            for i in range(3)
+        ]
+        for i in range(12):
+            offer = Offer.objects.create(
+                user=self.users[i % 3], title=f"Offer {i}", description="Budget test"
+            )
+            OfferDetail.objects.bulk_create([
+                OfferDetail(
+                    offer=offer, title=offer_type, revisions=1, delivery_time_in_days=days,
+                    price=10 * days, offer_type=offer_type, features={}
+                )
+                for days, offer_type in enumerate(["basic", "standard", "premium"], start=1)
+            ])
+        self.offer = offer
+        self.list_url = reverse('offers-list')
+
+    def test_list_within_budget_for_any_page_size(self):
+        for page_size in (1, 5, 12):
+            response = self.assertWithinBudget(
+                self.LIST_BUDGET, self.client.get, self.list_url, {'page_size': page_size}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), page_size)
+
+    def test_filtered_list_within_budget(self):
+        params = {'creator_id': self.users[0].id, 'min_price': 10, 'max_delivery_time': 3, 'page_size': 12}
+        response = self.assertWithinBudget(self.LIST_BUDGET, self.client.get, self.list_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 4)
+
+    def test_retrieve_within_budget(self):
+        self.client.force_authenticate(user=self.users[0])
+        url = reverse('offers-detail', kwargs={'pk': self.offer.pk})
+        response = self.assertWithinBudget(self.RETRIEVE_BUDGET, self.client.get, url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['details']), 3)
+
+
+class OfferCursorPaginationTests(APITestCase):
+    """Opt-in keyset pagination over /api/offers/."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='cursorbiz', type='business')
+        for i in range(7):
+            offer = Offer.objects.create(user=self.user, title=f"Offer {i}", description="Cursor test")
+            OfferDetail.objects.create(
+                offer=offer, title="Basic", revisions=1, delivery_time_in_days=1,
+                price=10 * (i % 3 + 1), offer_type="basic", features={}
+            )
+        Offer.objects.create(user=self.user, title="No details", description="Cursor test")
+        self.list_url = reverse('offers-list')
+
+    def _walk(self, params):
+        ids, url, response = [], self.list_url, None
+        while url:
+            response = self.client.get(url, params if url == self.list_url else None)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        return ids, response
+
+    def test_cursor_walk_by_updated_at_visits_every_offer_once(self):
+        ids, _ = self._walk({'pagination': 'cursor', 'page_size': 3})
+        expected = list(Offer.objects.order_by('-updated_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_cursor_walk_by_min_price_keeps_null_prices_last(self):
+        ids, last_page = self._walk({'pagination': 'cursor', 'page_size': 3, 'ordering': 'min_price'})
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), Offer.objects.count())
+        self.assertEqual(ids[-1], Offer.objects.get(title="No details").id)
+
+        previous = self.client.get(last_page.data['previous'])
+        self.assertEqual([item['id'] for item in previous.data['results']], ids[-5:-2])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(self.list_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_wrongly_typed_value_returns_404(self):
+        for ordering, value in (('min_price', 'cheap'), ('updated_at', 'yesterday'), ('updated_at', [1])):
+            raw = json.dumps({'v': value, 'p': 1}).encode()
+            cursor = base64.urlsafe_b64encode(raw).decode()
+            response = self.client.get(self.list_url, {'cursor': cursor, 'ordering': ordering})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OfferSearchTests(APITestCase):
+    """The search parameter is answered from the full-text index."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='searchbiz', type='business')
+        self.website = Offer.objects.create(
+            user=self.user, title="Website development", description="Landing pages and shops"
+        )
+        self.mobile = Offer.objects.create(
+            user=self.user, title="Mobile app", description="Native apps, website integration"
+        )
+        Offer.objects.create(user=self.user, title="Logo design", description="Vector graphics")
+        self.list_url = reverse('offers-list')
+
+    def _ids(self, params):
+        response = self.client.get(self.list_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in response.data['results']]
+
+    def test_prefix_search_ranks_title_matches_first(self):
+        self.assertEqual(self._ids({'search': 'webs'}), [self.website.id, self.mobile.id])
+
+    def test_ranked_search_matches_the_index_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._ids({'search': 'webs'})
+
+        searches = [query['sql'] for query in queries.captured_queries if 'MATCH' in query['sql']]
+        sql = searches[-1]
+        self.assertEqual(sql.count('MATCH'), 1)
+        self.assertIn('"rank"', sql)
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self._ids({'search': 'mobile website'}), [self.mobile.id])
+
+    def test_index_follows_offer_updates_and_deletes(self):
+        Offer.objects.filter(pk=self.mobile.pk).update(title="Backend service", description="APIs")
+        self.assertEqual(self._ids({'search': 'website'}), [self.website.id])
+
+        self.website.delete()
+        self.assertEqual(self._ids({'search': 'website'}), [])
+        self.assertEqual(self._ids({'search': 'backend'}), [self.mobile.id])
+
+    def test_query_syntax_is_ignored(self):
+        self.assertEqual(self._ids({'search': '"logo* ('}), [Offer.objects.get(title="Logo design").id])
+
+
+class OfferListCacheTests(QueryBudgetMixin, APITestCase):
+    """The anonymous offer list is served from the versioned response cache."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='cachebiz', type='business')
+        self.offer = Offer.objects.create(user=self.user, title="Cached", description="Cache test")
+        self.detail = OfferDetail.objects.create(
+            offer=self.offer, title="Basic", revisions=1, delivery_time_in_days=3,
+            price=40, offer_type="basic", features={}
+        )
+        self.list_url = reverse('offers-list')
+
+    def test_repeated_query_is_served_without_queries(self):
+        first = self.client.get(self.list_url, {'page_size': 5, 'search': ''})
+        with self.assertNumQueries(0):
+            second = self.client.get(self.list_url, {'page_size': '5'})
+        self.assertEqual(first.data, second.data)
+
+    def test_queryset_update_invalidates_list(self):
+        self.client.get(self.list_url)
+        OfferDetail.objects.filter(pk=self.detail.pk).update(price=15)
+        Offer.objects.filter(pk=self.offer.pk).update(title="Renamed")
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data['results'][0]['title'], "Renamed")
+        self.assertEqual(float(response.data['results'][0]['min_price']), 15.0)
+
+    def test_delete_invalidates_list(self):
+        self.client.get(self.list_url)
+        self.offer.delete()
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data['count'], 0)
+
+    def test_created_offer_invalidates_list(self):
+        self.client.get(self.list_url)
+        self.client.force_authenticate(user=self.user)
+        payload = {"title": "Posted", "description": "Bulk insert", "details": [
+            {"title": "Basic", "revisions": 1, "delivery_time_in_days": 2, "price": "20.00",
+             "features": {}, "offer_type": "basic"},
+        ]}
+        created = self.client.post(self.list_url, payload, format='json')
+        self.assertEqual(created.status_code, status.HTTP_201_CREATED)
+        self.client.force_authenticate(user=None)
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data['count'], 2)
+        self.assertIn("Posted", [item['title'] for item in response.data['results']])
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        release = threading.Event()
+
+        def producer():
+            calls.append(1)
+            release.wait(1)
+            return 'value'
+
+        key = f'{offer_list_cache.namespace}:test:{self.id()}'
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(offer_list_cache.get_or_set(key, producer)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 5)
+
+
+@skipUnless(Image, "Pillow is not installed")
+class OfferImageVariantTests(APITestCase):
+    """Resized image variants are produced after commit, outside of the request."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='imagebiz', type='business')
+
+    def _upload(self, size=(1200, 800)):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, 'PNG')
+        return SimpleUploadedFile('banner.png', buffer.getvalue(), content_type='image/png')
+
+    def test_variants_are_scheduled_on_commit_and_exposed(self):
+        with mock.patch('core.images.get_executor') as get_executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                offer = Offer.objects.create(
+                    user=self.user, title="Image", description="Variants", image=self._upload()
+                )
+                get_executor.assert_not_called()
+        get_executor.return_value.submit.assert_called_once()
+        self.assertEqual(
+            get_executor.return_value.submit.call_args.args[1:],
+            ('offers_app.Offer', offer.pk, 'image', 'image_variants', offer.image.name),
+        )
+        self.assertEqual(offer.image_variants, {})
+
+        variants = process_variants('offers_app.Offer', offer.pk, 'image', 'image_variants', offer.image.name)
+        with Image.open(f"{self.media_root}/{variants['thumbnail']}") as thumbnail:
+            self.assertEqual(thumbnail.size, (320, 213))
+
+        response = self.client.get(reverse('offers-list'))
+        urls = response.data['results'][0]['image_variants']
+        self.assertTrue(urls['thumbnail'].endswith('banner_thumbnail.webp'))
+        self.assertTrue(urls['medium'].endswith('banner_medium.webp'))
+
+    def test_stale_job_is_skipped(self):
+        offer = Offer.objects.create(user=self.user, title="Image", description="Variants", image=self._upload())
+        old_name = offer.image.name
+        offer.image = self._upload((50, 50))
+        offer.save()
+
+        self.assertIsNone(process_variants('offers_app.Offer', offer.pk, 'image', 'image_variants', old_name))
+        offer.refresh_from_db()
+        self.assertEqual(offer.image_variants, {})
+
+
+class OfferConditionalGetTests(APITestCase):
+    """Offer and detail endpoints answer revalidation requests with 304."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='etagbiz', type='business')
+        self.offer = Offer.objects.create(user=self.user, title="ETag", description="Conditional GET")
+        self.detail = OfferDetail.objects.create(
+            offer=self.offer, title="Basic", revisions=1, delivery_time_in_days=3,
+            price=40, offer_type="basic", features={}
+        )
+        self.offer_url = reverse('offers-detail', kwargs={'pk': self.offer.pk})
+        self.detail_url = reverse('offerdetails-detail', kwargs={'pk': self.detail.pk})
+        self.client.force_authenticate(user=self.user)
+
+    def test_retrieve_returns_304_without_loading_the_offer(self):
+        response = self.client.get(self.offer_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response.headers)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.offer_url, HTTP_IF_NONE_MATCH=response.headers['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_detail_change_invalidates_offer_and_tier_etags(self):
+        offer_etag = self.client.get(self.offer_url).headers['ETag']
+        detail_etag = self.client.get(self.detail_url).headers['ETag']
+        self.assertEqual(
+            self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+
+        self.client.patch(self.offer_url, {"details": [{"offer_type": "basic", "price": "45.00"}]}, format='json')
+
+        self.assertEqual(self.client.get(self.offer_url, HTTP_IF_NONE_MATCH=offer_etag).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code, status.HTTP_200_OK)
+
+    def test_list_etag_follows_the_cache_version(self):
+        list_url = reverse('offers-list')
+        etag = self.client.get(list_url).headers['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Offer.objects.filter(pk=self.offer.pk).update(title="Changed")
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_review_changes_the_offer_rating_and_etags(self):
+        customer = User.objects.create_user(username='etagkunde', type='customer')
+        list_url = reverse('offers-list')
+        offer_etag = self.client.get(self.offer_url).headers['ETag']
+        list_etag = self.client.get(list_url).headers['ETag']
+
+        review = Reviews.objects.create(reviewer=customer, business_user=self.user, rating=4, description="Gut")
+
+        response = self.client.get(self.offer_url, HTTP_IF_NONE_MATCH=offer_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user_rating']['average_rating'], 4.0)
+        response = self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['user_rating']['review_count'], 1)
+
+        offer_etag = self.client.get(self.offer_url).headers['ETag']
+        review.delete()
+
+        response = self.client.get(self.offer_url, HTTP_IF_NONE_MATCH=offer_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user_rating']['review_count'], 0)
+
+    def test_missing_offer_still_returns_404(self):
+        url = reverse('offers-detail', kwargs={'pk': 9999})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OfferAsyncReadTests(APITestCase):
+    """List and retrieve are async views that answer like the sync ones."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='asyncbiz', type='business')
+        for i in range(3):
+            offer = Offer.objects.create(user=self.user, title=f"Async {i}", description="Async read")
+            OfferDetail.objects.create(
+                offer=offer, title="Basic", revisions=1, delivery_time_in_days=2 + i,
+                price=10 * (i + 1), offer_type="basic", features={}
+            )
+        self.offer = offer
+        self.list_url = reverse('offers-list')
+        self.detail_url = reverse('offers-detail', kwargs={'pk': offer.pk})
+        self.token = Token.objects.create(user=self.user)
+
+    def test_read_routes_are_coroutines(self):
+        self.assertTrue(asyncio.iscoroutinefunction(resolve(self.list_url).func))
+        self.assertTrue(asyncio.iscoroutinefunction(resolve(self.detail_url).func))
+
+    def test_async_and_sync_views_return_the_same_data(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        params = {'ordering': 'min_price', 'page_size': 2}
+        async_list = self.client.get(self.list_url, params).data
+        async_detail = self.client.get(self.detail_url).data
+        offer_list_cache.bump()
+
+        with override_settings(ASYNC_READ_VIEWS=False):
+            self.assertEqual(self.client.get(self.list_url, params).data, async_list)
+            self.assertEqual(self.client.get(self.detail_url).data, async_detail)
+        self.assertEqual(async_list['count'], 3)
+        self.assertEqual([item['min_price'] for item in async_list['results']], [10, 20])
+
+    async def test_async_client_authenticates_with_token(self):
+        headers = {'Authorization': f'Token {self.token.key}'}
+        response = await self.async_client.get(self.detail_url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['title'], "Async 2")
+
+        response = await self.async_client.get(self.detail_url, headers={'Authorization': 'Token invalid'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
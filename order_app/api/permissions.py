@@ -47,4 +47,13 @@ class IsOwnOrder(permissions.BasePermission):
     or the business user who received it.
     """
     def has_object_permission(self, request, view, obj):
-        return obj.customer_user == request.user or obj.business_user == request.user
\ No newline at end of file
+        return obj.customer_user == request.user or obj.business_user == request.user
+
+
+class IsBusinessAccount(permissions.BasePermission):
+    """
+    Global permission for actions reserved to business accounts, 
+    e.g. bulk status changes of received orders.
+    """
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and request.user.type == 'business'
@@ -1,3 +1,5 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
 from rest_framework import serializers
 from offers_app.models import OfferDetail
 from order_app.models import Order
@@ -6,16 +8,10 @@ class OderSerializer(serializers.ModelSerializer):
     """
     Serializer for viewing and creating orders.
     
-    Uses ReadOnlyFields with source mapping to pull detailed information 
-    (title, price, delivery time, etc.) from the associated OfferDetail.
+    The tier information (title, price, delivery time, etc.) is read from the 
+    snapshot stored on the order at purchase time, not from the OfferDetail.
     The customer and business users are linked automatically and treated as read-only.
     """
-    title = serializers.ReadOnlyField(source='offer_detail.title')
-    revisions = serializers.ReadOnlyField(source='offer_detail.revisions')
-    delivery_time_in_days = serializers.ReadOnlyField(source='offer_detail.delivery_time_in_days')
-    price = serializers.ReadOnlyField(source='offer_detail.price')
-    features = serializers.ReadOnlyField(source='offer_detail.features')
-    offer_type = serializers.ReadOnlyField(source='offer_detail.offer_type')
     customer_user = serializers.PrimaryKeyRelatedField(read_only=True)
     business_user = serializers.PrimaryKeyRelatedField(read_only=True)
     offer_detail_id = serializers.IntegerField(write_only=True, required=True)
@@ -26,38 +22,62 @@ class OderSerializer(serializers.ModelSerializer):
             'id', 'business_user', 'customer_user',  'title', 'revisions', 'delivery_time_in_days',
              'price', 'features', "offer_type", 'status', 'created_at', 'updated_at', "offer_detail_id"
         ]
+        read_only_fields = Order.SNAPSHOT_FIELDS
 
     def validate_offer_detail_id(self, value):
         """
-        Validates that offer_detail_id is a strict integer and exists.
+        Validates that offer_detail_id is a strict integer.
         
         - Checks the raw input type to prevent string-to-integer conversion.
-        - Verifies that the referenced OfferDetail exists in the database.
         - Raises 400 if validation fails.
         """
         raw_value = self.initial_data.get('offer_detail_id')
         
         if not isinstance(raw_value, int):
             raise serializers.ValidationError("only integer allowed")
-
-        if not OfferDetail.objects.filter(id=value).exists():
-            raise serializers.ValidationError("400")
             
         return value
 
+    def validate(self, attrs):
+        """
+        Loads the referenced OfferDetail together with the seller's id in one 
+        joined query and replaces the raw id with it. The seller becomes the 
+        business user of the order without fetching the user itself.
+        Raises 400 if the OfferDetail does not exist.
+        """
+        offer_detail_id = attrs.pop('offer_detail_id', None)
+        if offer_detail_id is None:
+            return attrs
+        offer_detail = (
+            OfferDetail.objects.annotate(seller_id=F('offer__user_id'))
+            .filter(id=offer_detail_id)
+            .first()
+        )
+        if offer_detail is None:
+            raise serializers.ValidationError({"offer_detail_id": ["400"]})
+        attrs['offer_detail'] = offer_detail
+        attrs['business_user_id'] = offer_detail.seller_id
+        return attrs
+
+    def create(self, validated_data):
+        """
+        Inserts the order directly and relies on the unique constraint of 
+        (customer_user, offer_detail) to reject duplicates, which also 
+        covers concurrent requests. A violation is returned as 400.
+        """
+        try:
+            with transaction.atomic():
+                return Order.objects.create(**validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError("Order already exists for this offer detail and user.")
+
 class OrderUpdateSerializer(serializers.ModelSerializer):
     """
     Serializer optimized for updating an existing order's progress.
     
-    Maintains visibility of all order details while specifically 
-    allowing modification of the 'status' field.
+    Maintains visibility of all order details (read from the order's own 
+    snapshot) while specifically allowing modification of the 'status' field.
     """
-    title = serializers.ReadOnlyField(source='offer_detail.title')
-    revisions = serializers.ReadOnlyField(source='offer_detail.revisions')
-    delivery_time_in_days = serializers.ReadOnlyField(source='offer_detail.delivery_time_in_days')
-    price = serializers.ReadOnlyField(source='offer_detail.price')
-    features = serializers.ReadOnlyField(source='offer_detail.features')
-    offer_type = serializers.ReadOnlyField(source='offer_detail.offer_type')
     customer_user = serializers.PrimaryKeyRelatedField(read_only=True)
     business_user = serializers.PrimaryKeyRelatedField(read_only=True)
     offer_detail_id = serializers.IntegerField(write_only=True, required=True)
@@ -67,6 +87,7 @@ class OrderUpdateSerializer(serializers.ModelSerializer):
             'id', 'business_user', 'customer_user',  'title', 
             'revisions', 'delivery_time_in_days', 'price', 'features', "offer_type", 'status', 'created_at', 'updated_at', 'offer_detail_id'
         ]
+        read_only_fields = Order.SNAPSHOT_FIELDS
 
     def validate_offer_detail_id(self, value):
         """
@@ -94,4 +115,34 @@ class OrderUpdateSerializer(serializers.ModelSerializer):
         """
         instance.status = validated_data.get('status', instance.status)
         instance.save()
-        return instance
\ No newline at end of file
+        return instance
+
+class OrderBulkStatusSerializer(serializers.Serializer):
+    """
+    Input of the bulk status endpoint: the ids of up to 100 orders 
+    and the status all of them should move to.
+    """
+    order_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=100
+    )
+    status = serializers.ChoiceField(choices=Order.StatusType.choices)
+
+    def save(self, business_user):
+        """
+        Applies the status to the orders of the business user and returns one 
+        result per requested id. Orders of other sellers are reported as 
+        'not_found', so the response does not reveal their existence.
+        """
+        order_ids = list(dict.fromkeys(self.validated_data['order_ids']))
+        target = self.validated_data['status']
+        previous = Order.objects.filter(pk__in=order_ids, business_user=business_user).set_status(target)
+        results = []
+        for order_id in order_ids:
+            if order_id not in previous:
+                result = 'not_found'
+            elif previous[order_id] == target:
+                result = 'unchanged'
+            else:
+                result = 'updated'
+            results.append({'id': order_id, 'result': result})
+        return {'status': target, 'results': results}
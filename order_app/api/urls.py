@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import OrderCompletedCountViewSet, OrderCountViewSet, OrdersViewSet
+from .views import OrderCompletedCountViewSet, OrderCountBatchViewSet, OrderCountViewSet, OrdersViewSet, order_events
 from rest_framework import routers
 from django.urls import path, include 
 
@@ -7,7 +7,9 @@ router = routers.DefaultRouter()
 router.register(r'orders', OrdersViewSet, basename="orders")
 router.register(r'order-count', OrderCountViewSet, basename="order-count")
 router.register(r'completed-order-count', OrderCompletedCountViewSet, basename="completed-order-count")
+router.register(r'order-counts', OrderCountBatchViewSet, basename="order-counts")
 
 urlpatterns = [
+    path('orders/events/', order_events, name='order-events'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
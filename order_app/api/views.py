@@ -1,15 +1,22 @@
+import json
+
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from offers_app.models import OfferDetail
-from order_app.api.permissions import IsAdmin, IsBusinessUser, IsCustomer, IsOwnOrder
-from order_app.api.serializer import OderSerializer, OrderUpdateSerializer
+from order_app.api.permissions import IsAdmin, IsBusinessAccount, IsBusinessUser, IsCustomer, IsOwnOrder
+from order_app.api.serializer import OderSerializer, OrderBulkStatusSerializer, OrderUpdateSerializer
 from order_app.models import Order
 from rest_framework.response import Response
-from rest_framework.exceptions import ValidationError
-from django.db.models import Q
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from rest_framework.exceptions import ValidationError
 
-from reviews_app.tests import User
+from core.async_views import aget_token_user, unauthorized_response
+from core.events import get_backend, user_channel
+from core.pagination import StandardResultsSetPagination
 
 class OrdersViewSet(viewsets.ModelViewSet):
     """
@@ -21,6 +28,9 @@ class OrdersViewSet(viewsets.ModelViewSet):
     queryset = Order.objects.all()   
     serializer_class = OderSerializer
     permission_classes = [IsAuthenticated, IsCustomer]
+    pagination_class = StandardResultsSetPagination
+    cursor_ordering_fields = ['created_at', 'updated_at']
+    cursor_default_ordering = '-created_at'
     
     def get_object(self):
         obj = get_object_or_404(self.get_queryset(), pk=self.kwargs["pk"])
@@ -29,26 +39,13 @@ class OrdersViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """
-        Creates a new order and assigns the customer and business user.
+        Creates a new order for the requesting customer.
         
-        Extracts the offer detail from the request data, identifies the seller,
-        and checks if an active order for this specific package already exists 
-        to prevent duplicates.
-        """
-        od_id = self.request.data.get('offer_detail_id')            
-        if not od_id:
-                raise ValidationError({"offer_detail_id": "Dieses Feld ist erforderlich."})
-
-        offer_detail_obj = get_object_or_404(OfferDetail, id=od_id)            
-        seller = offer_detail_obj.offer.user
-        if Order.objects.filter(customer_user=self.request.user, offer_detail=offer_detail_obj).exists():        
-                raise ValidationError("Order already exists for this offer detail and user.")
-
-        serializer.save(
-            customer_user=self.request.user,
-            business_user=seller,
-            offer_detail=offer_detail_obj 
-        )
+        The serializer resolves the offer detail and its seller in one query 
+        and inserts the order directly; duplicates for the same package are 
+        rejected by the database's unique constraint.
+        """
+        serializer.save(customer_user=self.request.user)
         
     def get_serializer_class(self):
         """
@@ -57,21 +54,24 @@ class OrdersViewSet(viewsets.ModelViewSet):
         """
         if self.action == 'partial_update':
             return OrderUpdateSerializer        
+        if self.action == 'bulk_status':
+            return OrderBulkStatusSerializer
         return OderSerializer
     
     def get_queryset(self):
         """
-        Returns the queryset of orders filtered by the current user's involvement.
-        The Q objects are used to perform an OR filter between customer and business user.
+        Returns the queryset of orders filtered by the current user's involvement, 
+        i.e. the orders the user bought or sold (see OrderQuerySet.visible_to).
+        Orders carry a snapshot of the purchased tier, so nothing from the offer 
+        tables is joined in. The newest orders come first so the list can be paginated.
         """
         user = self.request.user
+        queryset = Order.objects.order_by('-created_at', '-id')
         
         if user.is_superuser:
-            return Order.objects.all()
+            return queryset
             
-        return Order.objects.filter(
-            Q(customer_user=user) | Q(business_user=user)
-        ).distinct()
+        return queryset.visible_to(user)
         
     def get_permissions(self):
         """
@@ -79,6 +79,7 @@ class OrdersViewSet(viewsets.ModelViewSet):
         - partial_update: Only the associated business user.
         - destroy: Only administrative accounts.
         - list/create: Authenticated customers.
+        - bulk_status: Business accounts, limited to their own orders.
         """
         if self.action == "partial_update":
             return [IsAuthenticated(), IsBusinessUser()]
@@ -86,9 +87,35 @@ class OrdersViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated(), IsAdmin()]
         if self.action == "list":
             return [IsAuthenticated(), IsOwnOrder()]
+        if self.action == "bulk_status":
+            return [IsAuthenticated(), IsBusinessAccount()]
 
         return super().get_permissions()
-    
+
+    @action(detail=False, methods=["post"], url_path="bulk-status")
+    def bulk_status(self, request):
+        """
+        Moves many orders of the requesting business user to one status.
+
+        Ownership is checked with a single query and all changes are applied 
+        with one UPDATE in a transaction, together with the order counters. 
+        The response lists the outcome per requested id.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save(business_user=request.user), status=status.HTTP_200_OK)
+
+
+def get_order_counts(business_user_ids):
+    """
+    Returns {business_user_id: (in_progress, completed)} for the given ids 
+    that belong to business users. Reads the materialized counters with one 
+    joined query; business users without a counter row have no orders yet.
+    """
+    rows = get_user_model().objects.filter(id__in=business_user_ids, type='business').values_list(
+        'id', 'order_counter__in_progress_count', 'order_counter__completed_count'
+    )
+    return {user_id: (in_progress or 0, completed or 0) for user_id, in_progress, completed in rows}
 
 
 class OrderCountViewSet(viewsets.ViewSet):
@@ -101,8 +128,10 @@ class OrderCountViewSet(viewsets.ViewSet):
         """
         Returns the count of all orders with the status 'in_progress' for to the business user identified by pk.
         """
-        get_object_or_404(User, id=pk, type='business')
-        order_count = Order.objects.filter(business_user_id=pk, status='in_progress').count()        
+        counts = get_order_counts([pk]) if str(pk).isdigit() else {}
+        if not counts:
+            raise Http404
+        order_count, _ = counts[int(pk)]
         return Response({'order_count': order_count}, status=status.HTTP_200_OK)
     
 class OrderCompletedCountViewSet(viewsets.ViewSet):
@@ -115,6 +144,98 @@ class OrderCompletedCountViewSet(viewsets.ViewSet):
         """
         Returns the count of orders with the status 'completed' for the business user identified by pk.
         """
-        get_object_or_404(User, id=pk, type='business')
-        ordcompleted_order_counter_count = Order.objects.filter(business_user_id=pk, status='completed').count()        
-        return Response({'completed_order_count': ordcompleted_order_counter_count}, status=status.HTTP_200_OK)
\ No newline at end of file
+        counts = get_order_counts([pk]) if str(pk).isdigit() else {}
+        if not counts:
+            raise Http404
+        _, completed_order_count = counts[int(pk)]
+        return Response({'completed_order_count': completed_order_count}, status=status.HTTP_200_OK)
+
+
+class OrderCountBatchViewSet(viewsets.ViewSet):
+    """
+    Returns the order counts of many business users in one request, 
+    e.g. for a list of offers: /api/order-counts/?business_user_ids=1,2,3
+    """
+    permission_classes = [IsAuthenticated]
+    max_ids = 100
+
+    def list(self, request):
+        """
+        Returns one entry per requested business user, in request order. 
+        Ids that do not belong to a business user are left out.
+        """
+        raw = request.query_params.get('business_user_ids', '')
+        try:
+            ids = list(dict.fromkeys(int(value) for value in raw.split(',') if value.strip()))
+        except ValueError:
+            raise ValidationError({'business_user_ids': ['Expected a comma separated list of ids.']})
+        if not ids:
+            raise ValidationError({'business_user_ids': ['This parameter is required.']})
+        if len(ids) > self.max_ids:
+            raise ValidationError({'business_user_ids': [f'At most {self.max_ids} ids are allowed.']})
+
+        counts = get_order_counts(ids)
+        return Response([
+            {
+                'business_user_id': user_id,
+                'order_count': counts[user_id][0],
+                'completed_order_count': counts[user_id][1],
+            }
+            for user_id in ids if user_id in counts
+        ], status=status.HTTP_200_OK)
+
+
+async def order_events(request):
+    """
+    Server-Sent Events stream of order changes for the authenticated user.
+
+    Sends an 'order.created' or 'order.status' event whenever an order the 
+    user bought or sold is created or changes its status, so clients no 
+    longer need to poll the order list or the count endpoints. Waiting 
+    connections are plain coroutines under ASGI and hold no worker thread; 
+    a comment line is sent every EVENTS_HEARTBEAT_SECONDS to keep proxies 
+    from closing idle connections.
+
+    Browsers' EventSource cannot set headers, so the token may also be 
+    passed as the 'token' query parameter instead of the Authorization header.
+
+    Under WSGI (e.g. runserver) an endless stream would block its thread 
+    forever, so each request is answered as a short poll instead: the next 
+    event or a keep-alive after at most EVENTS_WSGI_POLL_SECONDS, after which 
+    the response ends and EventSource reconnects. Events published while the 
+    client reconnects are missed. With the default InProcessBackend only 
+    events published by the same process are delivered (see core.events).
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    user = await aget_token_user(request, query_param='token')
+    if user is None:
+        return unauthorized_response()
+
+    heartbeat = getattr(settings, 'EVENTS_HEARTBEAT_SECONDS', 15)
+
+    async def stream(timeout, once=False):
+        backend = get_backend()
+        subscription = backend.subscribe([user_channel(user.pk)])
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                event = await subscription.get(timeout=timeout)
+                if event is None:
+                    yield ': keep-alive\n\n'
+                else:
+                    yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                if once:
+                    return
+        finally:
+            backend.unsubscribe(subscription)
+
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(stream(heartbeat), content_type='text/event-stream')
+    else:
+        timeout = min(heartbeat, getattr(settings, 'EVENTS_WSGI_POLL_SECONDS', 1))
+        content = ''.join([chunk async for chunk in stream(timeout, once=True)])
+        response = HttpResponse(content, content_type='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
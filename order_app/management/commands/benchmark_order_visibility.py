@@ -0,0 +1,95 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from offers_app.models import Offer, OfferDetail
+from order_app.models import Order
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Compares the visibility query of the order list (an OR without DISTINCT, 
+    see OrderQuerySet.visible_to) with the former OR + DISTINCT and with ids 
+    from a UNION ALL of both lookups, on a seeded table. All seeded rows are 
+    rolled back.
+    """
+    help = "Benchmarks the order visibility query on a large seeded order table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=200000)
+        parser.add_argument('--sellers', type=int, default=500)
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def run(self, options):
+        User = get_user_model()
+        rng = random.Random(0)
+        sellers = User.objects.bulk_create([
+            User(username=f'bench-seller-{i}', type='business') for i in range(options['sellers'])
+        ])
+        customers = User.objects.bulk_create([
+            User(username=f'bench-customer-{i}', type='customer') for i in range(options['sellers'] * 4)
+        ])
+        offers = Offer.objects.bulk_create([
+            Offer(user=seller, title=f'Offer {seller.pk}', description='') for seller in sellers
+        ])
+        details = OfferDetail.objects.bulk_create([
+            OfferDetail(
+                offer=offer, title=tier, price=10, offer_type=tier,
+                revisions=1, delivery_time_in_days=1, features=[],
+            )
+            for offer in offers for tier in ('basic', 'standard', 'premium')
+        ])
+
+        pairs = set()
+        while len(pairs) < options['orders']:
+            pairs.add((rng.randrange(len(customers)), rng.randrange(len(details))))
+        Order.objects.bulk_create(
+            [
+                Order(
+                    customer_user=customers[customer],
+                    business_user_id=offers[detail // 3].user_id,
+                    offer_detail=details[detail],
+                )
+                for customer, detail in pairs
+            ],
+            batch_size=5000,
+        )
+        self.stdout.write(f"Seeded {options['orders']} orders.")
+
+        page = options['page_size']
+        ordered = Order.objects.order_by('-created_at', '-id')
+        for label, user in (('seller', sellers[0]), ('customer', customers[0])):
+            purchases = Order.objects.filter(customer_user=user).values('pk')
+            sales = Order.objects.filter(business_user=user).exclude(customer_user=user).values('pk')
+            variants = {
+                'OR + DISTINCT': ordered.filter(Q(customer_user=user) | Q(business_user=user)).distinct(),
+                'UNION ALL': ordered.filter(pk__in=purchases.union(sales, all=True)),
+                'visible_to': ordered.visible_to(user),
+            }
+            for name, queryset in variants.items():
+                elapsed = self.measure(lambda: (queryset.count(), list(queryset[:page])), options['repeat'])
+                self.stdout.write(f"{label:<8} {name:<14} {elapsed * 1000:8.2f} ms per page")
+
+    def measure(self, func, repeat):
+        func()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) / repeat
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from order_app.models import Order
+
+
+class Command(BaseCommand):
+    """
+    Fills the tier snapshot of orders that were created before orders 
+    stored their own copy. Only orders with an empty snapshot are touched, 
+    so orders bought before a later tier edit keep their original terms.
+    """
+    help = "Copies the purchased tier data onto orders without a snapshot."
+
+    def handle(self, *args, **options):
+        updated = Order.objects.filter(title='').copy_offer_details()
+        self.stdout.write(self.style.SUCCESS(f"Copied the tier data of {updated} orders."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from order_app.models import OrderCounter
+
+
+class Command(BaseCommand):
+    """
+    Recalculates the materialized order counters of all business users.
+    Needed once after the counters were introduced, or after orders were 
+    written with raw SQL that bypasses the model.
+    """
+    help = "Rebuilds the per business user order counters from the orders table."
+
+    def handle(self, *args, **options):
+        OrderCounter.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {OrderCounter.objects.count()} order counters."
+        ))
@@ -1,7 +1,139 @@
-from django.db import models
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
 from core import settings
+from core.events import publish_on_commit, user_channel
 from offers_app.models import OfferDetail
 
+
+def _count_deltas(rows, sign=1):
+    """
+    Turns (business_user_id, status, amount) rows into counter deltas per 
+    business user. Statuses that are not counted are ignored.
+    """
+    deltas = defaultdict(Counter)
+    for business_user_id, status, amount in rows:
+        field = OrderCounter.STATUS_FIELDS.get(status)
+        if field:
+            deltas[business_user_id][field] += sign * amount
+    return deltas
+
+
+def publish_order_event(kind, order_id, business_user_id, customer_user_id, status, updated_at):
+    """
+    Sends an order event to the streams of both parties after commit.
+    """
+    publish_on_commit(
+        [user_channel(business_user_id), user_channel(customer_user_id)],
+        {
+            'type': kind,
+            'id': order_id,
+            'status': status,
+            'business_user': business_user_id,
+            'customer_user': customer_user_id,
+            'updated_at': updated_at.isoformat() if updated_at else None,
+        },
+    )
+
+
+class OrderQuerySet(models.QuerySet):
+    """
+    QuerySet for orders that keeps the per-business OrderCounter rows in sync 
+    on bulk writes, which bypass Order.save(). Deletes are covered by the 
+    post_delete receiver below.
+    """
+
+    def visible_to(self, user):
+        """
+        Restricts the queryset to orders the user bought or sold.
+
+        Both conditions are on the order row itself, so the OR cannot 
+        produce duplicates and needs no DISTINCT. The database answers each 
+        branch from its own (user, created_at) index and merges the row ids 
+        (see the 'benchmark_order_visibility' command).
+        """
+        return self.filter(Q(customer_user=user) | Q(business_user=user))
+
+    def copy_offer_details(self):
+        """
+        Copies the current tier data onto the selected orders with one UPDATE. 
+        Used to fill the snapshot of orders created before it existed.
+        """
+        detail = OfferDetail.objects.filter(pk=OuterRef('offer_detail_id'))
+        return self.update(**{
+            field: Subquery(detail.values(field)[:1]) for field in Order.SNAPSHOT_FIELDS
+        })
+
+    def set_status(self, status):
+        """
+        Moves the selected orders to the given status in one transaction: one 
+        locking SELECT of the current states, one UPDATE of the orders that 
+        actually change and the matching counter deltas. 
+        Returns {order_id: previous_status} for every selected order.
+        """
+        with transaction.atomic(using=self.db):
+            rows = list(self.select_for_update().order_by().values_list(
+                'pk', 'business_user_id', 'customer_user_id', 'status'
+            ))
+            changed = [row for row in rows if row[3] != status]
+            if changed:
+                updated_at = timezone.now()
+                # The states are known already, so the counting update() is bypassed.
+                models.QuerySet.update(
+                    self.model.objects.filter(pk__in=[row[0] for row in changed]),
+                    status=status, updated_at=updated_at,
+                )
+                OrderCounter.objects.apply(
+                    _count_deltas([(business_user_id, previous, 1) for _, business_user_id, _, previous in changed], -1),
+                    _count_deltas([(business_user_id, status, 1) for _, business_user_id, _, _ in changed]),
+                )
+                for pk, business_user_id, customer_user_id, _ in changed:
+                    publish_order_event('order.status', pk, business_user_id, customer_user_id, status, updated_at)
+        return {row[0]: row[3] for row in rows}
+
+    def update(self, **kwargs):
+        if 'status' not in kwargs and 'business_user' not in kwargs and 'business_user_id' not in kwargs:
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            before = list(
+                self.order_by().values_list('business_user_id', 'status').annotate(amount=Count('pk'))
+            )
+            rows = super().update(**kwargs)
+            new_status = kwargs.get('status')
+            new_business = kwargs.get('business_user', kwargs.get('business_user_id'))
+            new_business = getattr(new_business, 'pk', new_business)
+            after = [
+                (business if new_business is None else new_business, status if new_status is None else new_status, amount)
+                for business, status, amount in before
+            ]
+            OrderCounter.objects.apply(_count_deltas(before, -1), _count_deltas(after))
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        missing = {
+            obj.offer_detail_id for obj in objs
+            if obj._state.adding and not Order.offer_detail.is_cached(obj)
+        }
+        details = OfferDetail.objects.in_bulk(missing) if missing else {}
+        for obj in objs:
+            if obj._state.adding and obj.offer_detail_id is not None:
+                obj.copy_offer_detail(details.get(obj.offer_detail_id) or obj.offer_detail)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            OrderCounter.objects.apply(
+                _count_deltas((obj.business_user_id, obj.status, 1) for obj in created if obj.pk is not None)
+            )
+            for obj in created:
+                if obj.pk is not None:
+                    obj.publish_event('order.created')
+        return created
+
 class Order(models.Model):
     """
     Represents a contractual agreement between a customer and a business user.
@@ -19,6 +151,8 @@ class Order(models.Model):
         IN_PROGRESS = "in_progress", "in_progress"
         COMPLETED = "completed", "completed"
 
+    SNAPSHOT_FIELDS = ('title', 'revisions', 'delivery_time_in_days', 'price', 'features', 'offer_type')
+
     
     offer_detail = models.ForeignKey(
         OfferDetail,
@@ -43,13 +177,165 @@ class Order(models.Model):
         choices=StatusType.choices,
         default=StatusType.IN_PROGRESS,
     )
+    # Snapshot of the purchased tier, see copy_offer_detail().
+    title = models.CharField(max_length=200, default='')
+    revisions = models.IntegerField(default=0)
+    delivery_time_in_days = models.IntegerField(default=0)
+    price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    features = models.JSONField(default=list)
+    offer_type = models.CharField(
+        max_length=20,
+        choices=OfferDetail.OfferType.choices,
+        default=OfferDetail.OfferType.BASIC,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
     class Meta:
             """
             Database constraints for the Order model.
             Ensures that a customer can only place one active order per 
             specific offer detail to prevent accidental duplicates.
+            The indexes cover the visibility lookups of both parties in 
+            creation order and the per-status counts of a business user.
             """
-            unique_together = ['customer_user', 'offer_detail']
\ No newline at end of file
+            unique_together = ['customer_user', 'offer_detail']
+            indexes = [
+                models.Index(fields=['business_user', 'status'], name='order_business_status_idx'),
+                models.Index(fields=['business_user', 'created_at'], name='order_business_created_at_idx'),
+                models.Index(fields=['customer_user', 'created_at'], name='order_customer_created_at_idx'),
+            ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counted_state = (instance.business_user_id, instance.status)
+        return instance
+
+    def copy_offer_detail(self, offer_detail):
+        """
+        Copies the purchased tier onto the order. Orders keep the terms they 
+        were bought with when the offer is edited later, and reading them 
+        needs no join to the offer tables.
+        """
+        for field in self.SNAPSHOT_FIELDS:
+            setattr(self, field, getattr(offer_detail, field))
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the order and moves it between the business user's counters 
+        in the same transaction when it is created or its status changes. 
+        The stored state is re-read under a row lock first, so concurrent 
+        saves of the same order cannot count a change twice. 
+        Both changes are also published to the event streams of the two parties.
+        New orders take a snapshot of their tier first.
+        """
+        if self._state.adding and self.offer_detail_id is not None:
+            self.copy_offer_detail(self.offer_detail)
+        previous = getattr(self, '_counted_state', None)
+        using = kwargs.get('using') or self._state.db
+        with transaction.atomic(using=using, savepoint=False):
+            if previous is not None:
+                # The state loaded with the instance may be stale, the locked row is counted.
+                previous = Order.objects.using(using).select_for_update().filter(pk=self.pk).values_list(
+                    'business_user_id', 'status'
+                ).first() or previous
+            super().save(*args, **kwargs)
+            current = (self.business_user_id, self.status)
+            if previous != current:
+                removed = _count_deltas([(*previous, 1)], -1) if previous else {}
+                OrderCounter.objects.apply(removed, _count_deltas([(*current, 1)]))
+            if previous is None:
+                self.publish_event('order.created')
+            elif previous[1] != self.status:
+                self.publish_event('order.status')
+        self._counted_state = current
+
+    def publish_event(self, kind):
+        publish_order_event(
+            kind, self.pk, self.business_user_id, self.customer_user_id, self.status, self.updated_at
+        )
+
+
+class OrderCounterQuerySet(models.QuerySet):
+    """
+    QuerySet for the materialized order counters.
+    """
+
+    def apply(self, *deltas):
+        """
+        Adds the given per-business deltas to the counters with one UPDATE 
+        per business user. Missing rows are created for positive deltas only, 
+        so cascades from a deleted business user never recreate a row.
+        """
+        merged = defaultdict(Counter)
+        for delta in deltas:
+            for business_user_id, fields in delta.items():
+                merged[business_user_id].update(fields)
+        for business_user_id, fields in merged.items():
+            changes = {
+                field: F(field) + amount if amount > 0 else Greatest(F(field) + amount, Value(0))
+                for field, amount in fields.items() if amount
+            }
+            if not changes:
+                continue
+            if self.filter(business_user_id=business_user_id).update(**changes):
+                continue
+            if all(amount >= 0 for amount in fields.values()):
+                try:
+                    with transaction.atomic(using=self.db):
+                        self.create(business_user_id=business_user_id, **fields)
+                except IntegrityError:
+                    # Created concurrently in the meantime.
+                    self.filter(business_user_id=business_user_id).update(**changes)
+
+    def rebuild(self):
+        """
+        Recalculates all counters from the orders table in one pass.
+        """
+        counts = _count_deltas(
+            Order.objects.order_by().values_list('business_user_id', 'status').annotate(amount=Count('pk'))
+        )
+        with transaction.atomic(using=self.db):
+            self.all().delete()
+            self.bulk_create([
+                OrderCounter(business_user_id=business_user_id, **fields)
+                for business_user_id, fields in counts.items()
+            ])
+
+
+class OrderCounter(models.Model):
+    """
+    Materialized number of in-progress and completed orders per business user.
+
+    Kept up to date in the same transaction as every order create, status 
+    change and delete, so the count endpoints never have to COUNT(*) orders. 
+    Run 'python manage.py rebuild_order_counters' after importing orders 
+    with raw SQL.
+    """
+    STATUS_FIELDS = {
+        Order.StatusType.IN_PROGRESS: 'in_progress_count',
+        Order.StatusType.COMPLETED: 'completed_count',
+    }
+
+    business_user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="order_counter",
+    )
+    in_progress_count = models.PositiveIntegerField(default=0)
+    completed_count = models.PositiveIntegerField(default=0)
+
+    objects = OrderCounterQuerySet.as_manager()
+
+
+@receiver(post_delete, sender=Order)
+def remove_order_from_counters(sender, instance, **kwargs):
+    """
+    Signal receiver that decrements the business user's counter after an 
+    order was deleted, individually or through a queryset.
+    """
+    OrderCounter.objects.apply(_count_deltas([(instance.business_user_id, instance.status, 1)], -1))
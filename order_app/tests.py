@@ -1,13 +1,24 @@
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
-from order_app.models import Order
+from order_app.models import Order, OrderCounter
 from offers_app.models import Offer, OfferDetail
+from core.events import get_backend, user_channel
+from core.query_budget import QueryBudgetMixin
+from rest_framework.authtoken.models import Token
 
 User = get_user_model()
 
-class OrderAPITests(APITestCase):
+class OrderAPITests(QueryBudgetMixin, APITestCase):
 
     def setUp(self):
         self.customer = User.objects.create_user(
@@ -40,6 +51,22 @@ class OrderAPITests(APITestCase):
         # Check ob Business User automatisch gesetzt wurde
         self.assertEqual(Order.objects.first().business_user, self.seller)
 
+    def test_create_order_runs_single_lookup_before_insert(self):
+        OrderCounter.objects.create(business_user=self.seller)
+        self.client.force_authenticate(user=self.customer)
+        # Lookup, savepoint, insert, counter update, release.
+        with self.assertNumQueries(5):
+            response = self.client.post(self.list_url, {"offer_detail_id": self.detail.id}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['business_user'], self.seller.id)
+        self.assertEqual(response.data['title'], "Basic")
+
+    def test_create_order_for_missing_detail_returns_400(self):
+        self.client.force_authenticate(user=self.customer)
+        response = self.client.post(self.list_url, {"offer_detail_id": 9999}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_prevent_duplicate_order(self):
         Order.objects.create(
             customer_user=self.customer, 
@@ -93,4 +120,285 @@ class OrderAPITests(APITestCase):
         self.client.force_authenticate(user=self.other_business)
         response = self.client.patch(url, {"status": "completed"})
         
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_order_list_is_paginated_within_query_budget(self):
+        offer_details = OfferDetail.objects.bulk_create([
+            OfferDetail(
+                offer=self.offer, title=f"Tier {i}", price=10 * i, offer_type="basic",
+                revisions=1, delivery_time_in_days=i, features={}
+            )
+            for i in range(1, 13)
+        ])
+        Order.objects.bulk_create([
+            Order(customer_user=self.customer, business_user=self.seller, offer_detail=detail)
+            for detail in offer_details
+        ])
+        self.client.force_authenticate(user=self.seller)
+
+        for page_size in (3, 12):
+            with self.assertMaxQueries(2):
+                response = self.client.get(self.list_url, {'page_size': page_size})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['count'], 12)
+            self.assertEqual(len(response.data['results']), page_size)
+        self.assertEqual(response.data['results'][0]['title'], "Tier 12")
+
+    def test_order_list_contains_purchases_and_sales_once(self):
+        other_detail = OfferDetail.objects.create(
+            offer=Offer.objects.create(user=self.other_business, title="Other", description="Test"),
+            title="Other", price=50, offer_type="basic", revisions=1, delivery_time_in_days=1, features={}
+        )
+        sale = Order.objects.create(customer_user=self.customer, business_user=self.seller, offer_detail=self.detail)
+        Order.objects.create(customer_user=self.customer, business_user=self.other_business, offer_detail=other_detail)
+        # A business user buying its own package is both customer and seller.
+        own = Order.objects.create(customer_user=self.seller, business_user=self.seller, offer_detail=self.detail)
+
+        self.client.force_authenticate(user=self.seller)
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([order['id'] for order in response.data['results']], [own.id, sale.id])
+
+    def test_order_keeps_purchased_tier_after_offer_edit(self):
+        order = Order.objects.create(customer_user=self.customer, business_user=self.seller, offer_detail=self.detail)
+        self.assertEqual((order.title, order.price), ("Basic", 100))
+
+        OfferDetail.objects.filter(pk=self.detail.pk).update(title="Renamed", price=250)
+        self.client.force_authenticate(user=self.customer)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url)
+
+        result = response.data['results'][0]
+        self.assertEqual((result['title'], result['price']), ("Basic", "100.00"))
+        self.assertEqual(result['offer_type'], "basic")
+        self.assertFalse(any('offers_app' in query['sql'] for query in queries.captured_queries))
+
+    def test_copy_offer_details_fills_missing_snapshots(self):
+        order = Order.objects.create(customer_user=self.customer, business_user=self.seller, offer_detail=self.detail)
+        Order.objects.filter(pk=order.pk).update(title='', price=0)
+
+        Order.objects.filter(title='').copy_offer_details()
+
+        order.refresh_from_db()
+        self.assertEqual((order.title, order.price, order.delivery_time_in_days), ("Basic", 100, 5))
+
+
+class OrderCounterTests(QueryBudgetMixin, APITestCase):
+
+    def setUp(self):
+        self.customer = User.objects.create_user(
+            username='buyer', password='password123', type='customer'
+        )
+        self.seller = User.objects.create_user(
+            username='seller', password='password123', type='business'
+        )
+        self.other_seller = User.objects.create_user(
+            username='other_seller', password='password123', type='business'
+        )
+        offer = Offer.objects.create(user=self.seller, title="Offer", description="Test")
+        self.details = OfferDetail.objects.bulk_create([
+            OfferDetail(
+                offer=offer, title=f"Tier {i}", price=10 * i, offer_type="basic",
+                revisions=1, delivery_time_in_days=i, features={}
+            )
+            for i in range(1, 5)
+        ])
+
+    def counts(self, user):
+        counter = OrderCounter.objects.filter(business_user=user).first()
+        return (counter.in_progress_count, counter.completed_count) if counter else (0, 0)
+
+    def create_order(self, detail, **kwargs):
+        return Order.objects.create(
+            customer_user=self.customer, business_user=self.seller, offer_detail=detail, **kwargs
+        )
+
+    def test_counters_follow_create_status_change_and_delete(self):
+        first = self.create_order(self.details[0])
+        self.create_order(self.details[1])
+        self.assertEqual(self.counts(self.seller), (2, 0))
+
+        first.status = Order.StatusType.COMPLETED
+        first.save()
+        self.assertEqual(self.counts(self.seller), (1, 1))
+        first.save()
+        self.assertEqual(self.counts(self.seller), (1, 1))
+
+        Order.objects.filter(pk=first.pk).update(status=Order.StatusType.IN_PROGRESS)
+        self.assertEqual(self.counts(self.seller), (2, 0))
+
+        Order.objects.all().delete()
+        self.assertEqual(self.counts(self.seller), (0, 0))
+
+    def test_stale_instances_count_the_stored_status(self):
+        order = self.create_order(self.details[0])
+        first = Order.objects.get(pk=order.pk)
+        second = Order.objects.get(pk=order.pk)
+
+        first.status = Order.StatusType.COMPLETED
+        first.save()
+        second.status = Order.StatusType.COMPLETED
+        second.save()
+        self.assertEqual(self.counts(self.seller), (0, 1))
+
+        first.status = Order.StatusType.IN_PROGRESS
+        first.save()
+        self.assertEqual(self.counts(self.seller), (1, 0))
+
+    def test_bulk_create_and_rebuild(self):
+        Order.objects.bulk_create([
+            Order(customer_user=self.customer, business_user=self.seller, offer_detail=detail)
+            for detail in self.details[:3]
+        ])
+        self.assertEqual(self.counts(self.seller), (3, 0))
+
+        OrderCounter.objects.all().delete()
+        OrderCounter.objects.rebuild()
+        self.assertEqual(self.counts(self.seller), (3, 0))
+
+    def test_count_endpoints_read_the_counter(self):
+        self.create_order(self.details[0])
+        self.create_order(self.details[1], status=Order.StatusType.COMPLETED)
+        self.client.force_authenticate(user=self.customer)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('order-count-detail', kwargs={'pk': self.seller.id}))
+        self.assertEqual(response.data, {'order_count': 1})
+        response = self.client.get(reverse('completed-order-count-detail', kwargs={'pk': self.seller.id}))
+        self.assertEqual(response.data, {'completed_order_count': 1})
+
+        response = self.client.get(reverse('order-count-detail', kwargs={'pk': self.customer.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_batch_counts_use_one_query(self):
+        self.create_order(self.details[0])
+        self.create_order(self.details[1], status=Order.StatusType.COMPLETED)
+        self.client.force_authenticate(user=self.customer)
+        ids = f'{self.other_seller.id},{self.seller.id},{self.customer.id}'
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('order-counts-list'), {'business_user_ids': ids})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [
+            {'business_user_id': self.other_seller.id, 'order_count': 0, 'completed_order_count': 0},
+            {'business_user_id': self.seller.id, 'order_count': 1, 'completed_order_count': 1},
+        ])
+
+    def test_batch_counts_reject_invalid_ids(self):
+        self.client.force_authenticate(user=self.customer)
+        for value in ('', 'abc', ','.join(str(i) for i in range(1, 102))):
+            response = self.client.get(reverse('order-counts-list'), {'business_user_ids': value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_status_updates_own_orders_in_one_update(self):
+        orders = [self.create_order(detail) for detail in self.details[:3]]
+        orders[2].status = Order.StatusType.COMPLETED
+        orders[2].save()
+        foreign = Order.objects.create(
+            customer_user=self.customer, business_user=self.other_seller, offer_detail=self.details[3]
+        )
+        self.client.force_authenticate(user=self.seller)
+        ids = [orders[0].id, orders[1].id, orders[2].id, foreign.id, 9999]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('orders-bulk-status'), {'order_ids': ids, 'status': 'completed'}, format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['result'] for item in response.data['results']],
+                         ['updated', 'updated', 'unchanged', 'not_found', 'not_found'])
+        order_updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "order_app_order"')]
+        self.assertEqual(len(order_updates), 1)
+        self.assertEqual(self.counts(self.seller), (0, 3))
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.status, Order.StatusType.IN_PROGRESS)
+
+    def test_bulk_status_is_reserved_to_business_accounts(self):
+        order = self.create_order(self.details[0])
+        self.client.force_authenticate(user=self.customer)
+        response = self.client.post(
+            reverse('orders-bulk-status'), {'order_ids': [order.id], 'status': 'completed'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.seller)
+        response = self.client.post(
+            reverse('orders-bulk-status'), {'order_ids': [order.id], 'status': 'cancelled'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class OrderEventStreamTests(APITestCase):
+
+    def setUp(self):
+        self.customer = User.objects.create_user(
+            username='buyer', password='password123', type='customer'
+        )
+        self.seller = User.objects.create_user(
+            username='seller', password='password123', type='business'
+        )
+        offer = Offer.objects.create(user=self.seller, title="Offer", description="Test")
+        self.detail = OfferDetail.objects.create(
+            offer=offer, title="Basic", price=100, offer_type="basic",
+            revisions=1, delivery_time_in_days=5, features={}
+        )
+        self.order = Order.objects.create(
+            customer_user=self.customer, business_user=self.seller, offer_detail=self.detail
+        )
+        self.token = Token.objects.create(user=self.customer)
+        self.url = reverse('order-events')
+
+    def complete_order(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.status = Order.StatusType.COMPLETED
+            self.order.save()
+
+    async def test_stream_delivers_status_change(self):
+        response = await self.async_client.get(self.url, headers={'Authorization': f'Token {self.token.key}'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+
+        await sync_to_async(self.complete_order)()
+        chunk = (await asyncio.wait_for(anext(stream), timeout=2)).decode()
+        await stream.aclose()
+
+        self.assertIn('event: order.status', chunk)
+        event = json.loads(chunk.split('data: ', 1)[1])
+        self.assertEqual((event['id'], event['status']), (self.order.id, 'completed'))
+
+    async def test_stream_accepts_token_query_parameter(self):
+        response = await self.async_client.get(self.url, {'token': self.token.key})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        await aiter(response.streaming_content).aclose()
+
+        response = await self.async_client.get(self.url, {'token': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(EVENTS_HEARTBEAT_SECONDS=60, EVENTS_WSGI_POLL_SECONDS=0.05)
+    def test_wsgi_request_is_answered_as_a_short_poll(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.content, b'retry: 3000\n\n: keep-alive\n\n')
+
+    @override_settings(EVENTS_WSGI_POLL_SECONDS=5)
+    def test_wsgi_poll_ends_with_the_next_event(self):
+        event = {'id': self.order.id, 'type': 'order.status', 'status': 'completed'}
+        timer = threading.Timer(0.2, get_backend().publish, (user_channel(self.customer.pk), event))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        self.assertIn(b'event: order.status', response.content)
+        self.assertTrue(response.content.endswith(b'\n\n'))
+
+    async def test_stream_requires_token(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
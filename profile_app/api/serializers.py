@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from profile_app.models import UserProfile
+from core.images import ImageVariantsField
+from reviews_app.api.serializers import UserRatingField
 
 class UserProfileListCustomerTypSerializer(serializers.ModelSerializer):
     """
@@ -13,11 +15,12 @@ class UserProfileListCustomerTypSerializer(serializers.ModelSerializer):
     last_name = serializers.CharField(source="user.last_name", read_only=True)
     type = serializers.CharField(source="user.type", read_only=True)
     file = serializers.ImageField(source="ImageField", read_only=True)
+    file_variants = ImageVariantsField(source="image_variants")
     uploaded_at = serializers.DateTimeField(source="user.date_joined", read_only=True)
 
     class Meta:
         model = UserProfile
-        fields = ["user", "username", "first_name", "last_name", "file", "uploaded_at", "type"]
+        fields = ["user", "username", "first_name", "last_name", "file", "file_variants", "uploaded_at", "type"]
     
      
 
@@ -25,7 +28,8 @@ class UserProfileListBusinessTypSerializer(serializers.ModelSerializer):
     """
     Serializer for a professional business profile view.
     Extends the basic profile with business-specific details such as 
-    location, contact number, description, and working hours.
+    location, contact number, description, working hours and the 
+    rating statistics.
     """
     user=serializers.PrimaryKeyRelatedField(read_only=True)
     username = serializers.CharField(source="user.username", read_only=True)
@@ -33,14 +37,16 @@ class UserProfileListBusinessTypSerializer(serializers.ModelSerializer):
     last_name = serializers.CharField(source="user.last_name", read_only=True)
     type = serializers.CharField(source="user.type", read_only=True)
     file = serializers.ImageField(source="ImageField", read_only=True)
+    file_variants = ImageVariantsField(source="image_variants")
     location = serializers.SerializerMethodField(read_only=True)
     tel = serializers.SerializerMethodField(read_only=True)
     description = serializers.SerializerMethodField(read_only=True)
     working_hours = serializers.SerializerMethodField(read_only=True)
     type = serializers.CharField(source="user.type", read_only=True)
+    rating = UserRatingField(source="user")
     class Meta:
         model = UserProfile 
-        fields = ["user", "username", "first_name", "last_name", "file", "location", "tel", "description", "working_hours", "type"]
+        fields = ["user", "username", "first_name", "last_name", "file", "file_variants", "location", "tel", "description", "working_hours", "type", "rating"]
 
     def get_location(self, obj):
         return obj.location or ""
@@ -58,7 +64,8 @@ class UserProfileDetailSerializer(serializers.ModelSerializer):
     """
     Comprehensive serializer for full user profile details.
     Aggregates all relevant user and profile data, including account metadata 
-    like email and the registration date.
+    like email and the registration date, and the rating statistics of 
+    business users.
     """
     user=serializers.PrimaryKeyRelatedField(read_only=True)
     username = serializers.CharField(source="user.username", read_only=True)
@@ -68,13 +75,15 @@ class UserProfileDetailSerializer(serializers.ModelSerializer):
     type = serializers.CharField(source="user.type", read_only=True)
     created_at = serializers.DateTimeField(source="user.date_joined", read_only=True)
     file = serializers.ImageField(source="ImageField", read_only=True)
+    file_variants = ImageVariantsField(source="image_variants")
     location = serializers.SerializerMethodField(read_only=True)
     tel = serializers.SerializerMethodField(read_only=True)
     description = serializers.SerializerMethodField(read_only=True)
     working_hours = serializers.SerializerMethodField(read_only=True)
+    rating = UserRatingField(source="user")
     class Meta:
         model = UserProfile
-        fields = ["user", "username", "first_name", "last_name", "file", "location", "tel", "description", "working_hours", "type", "email", "created_at"]
+        fields = ["user", "username", "first_name", "last_name", "file", "file_variants", "location", "tel", "description", "working_hours", "type", "email", "created_at", "rating"]
 
     def get_location(self, obj):
         return obj.location or ""
@@ -102,23 +111,26 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
     type = serializers.CharField(source="user.type", read_only=True)
     created_at = serializers.DateTimeField(source="user.date_joined", read_only=True)
     file = serializers.ImageField(source="ImageField", read_only=True)
+    file_variants = ImageVariantsField(source="image_variants")
     class Meta:
         model = UserProfile
-        fields = ["user", "username", "first_name", "last_name", "file", "location", "tel", "description", "working_hours", "type", "email", "created_at"]
+        fields = ["user", "username", "first_name", "last_name", "file", "file_variants", "location", "tel", "description", "working_hours", "type", "email", "created_at"]
 
     def update(self, instance, validated_data):
         """
         Custom update method to synchronize data across two models.
         Updates the primary User instance first before applying changes 
-        to the UserProfile instance.
+        to the UserProfile instance. Only changed columns are written.
         """
         user_data = validated_data.pop('user', {})
         user = instance.user
+        user_changed = False
         
         if user_data:
             user.first_name = user_data.get('first_name', user.first_name)
             user.last_name = user_data.get('last_name', user.last_name)
             user.email = user_data.get('email', user.email)
+            user_changed = bool(user.get_dirty_fields())
             user.save()
 
         instance.location = validated_data.get('location', instance.location)
@@ -126,5 +138,9 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
         instance.description = validated_data.get('description', instance.description)
         instance.working_hours = validated_data.get('working_hours', instance.working_hours)
 
-        instance.save()
+        if user_changed:
+            # The profile's 'updated_at' is its ETag, which covers the user's fields too.
+            instance.save(update_fields={*instance.get_dirty_fields(), 'updated_at'})
+        else:
+            instance.save()
         return instance
\ No newline at end of file
@@ -6,19 +6,29 @@ from profile_app.models import UserProfile
 from .serializers import UserProfileDetailSerializer, UserProfileUpdateSerializer, UserProfileListCustomerTypSerializer, UserProfileListBusinessTypSerializer
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
+from core.async_views import AsyncReadMixin
+from core.conditional import ConditionalGetMixin
+from core.object_memo import ObjectMemoMixin
+from core.pagination import StandardResultsSetPagination
+from reviews_app.api.serializers import USER_RATING_VALIDATOR_FIELDS
 
 
-class UserProfileViewSet(viewsets.ModelViewSet):
+class UserProfileViewSet(ConditionalGetMixin, ObjectMemoMixin, AsyncReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing the authenticated user's profile.
     
     Provides detailed views and update capabilities. It dynamically switches 
     serializers for retrieval and update actions and ensures that only the 
-    profile owner can perform modifications.
+    profile owner can perform modifications. Profiles are looked up by the 
+    User's ID from the URL, so mismatches between Profile IDs and User IDs do 
+    not matter. Retrieve is served as a coroutine (see AsyncReadMixin).
     """
-    queryset = UserProfile.objects.all()    
+    queryset = UserProfile.objects.select_related('user__review_stats')
     permission_classes = [IsAuthenticated]
+    async_actions = ('retrieve',)
+    lookup_field = 'user__id'
+    lookup_url_kwarg = 'pk'
+    validator_fields = USER_RATING_VALIDATOR_FIELDS
 
     serializer_class = UserProfileDetailSerializer
     serializer_detail_class = UserProfileDetailSerializer
@@ -26,12 +36,12 @@ class UserProfileViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """
-        Returns the queryset of UserProfiles.
+        Returns the queryset of UserProfiles with the user and its rating 
+        statistics joined in, since the serializers read them.
         Currently returns all profiles, but provides a hook for future 
         user-specific filtering.
         """
-        user = self.request.user
-        return UserProfile.objects.all()
+        return self.queryset.all()
         
     def get_serializer_class(self):
         """
@@ -53,32 +63,39 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         if self.action in ["update", "partial_update"]:
             return [IsAuthenticated(), IsOwnProfile()]
         return [IsAuthenticated()]
-        
-    
-    def get_object(self):
-        """
-        Retrieves the profile based on the User's ID (from the URL).
-        This prevents mismatches if Profile IDs and User IDs are not identical.
-        """
-        pk = self.kwargs.get('pk')
-        obj = get_object_or_404(UserProfile, user__id=pk)        
-        self.check_object_permissions(self.request, obj)
-        
-        return obj
 
 
-class UserProfilesViewSet(viewsets.ReadOnlyModelViewSet):
+class UserProfilesViewSet(ObjectMemoMixin, AsyncReadMixin, viewsets.ReadOnlyModelViewSet):
     """
     A read-only ViewSet for browsing user profiles.
     
     Includes custom actions to filter profiles based on user types 
-    (Customer or Business) with specialized list serializers for each type.
+    (Customer or Business) with specialized list serializers for each type. 
+    Both lists are paginated and only load the columns their serializer reads.
+    Retrieve is served as a coroutine (see AsyncReadMixin).
     """
-    queryset = UserProfile.objects.all()    
+    queryset = UserProfile.objects.select_related('user__review_stats')
     permission_classes = [IsAuthenticated]
     serializer_class = UserProfileDetailSerializer
+    async_actions = ('retrieve',)
+    pagination_class = StandardResultsSetPagination
+    cursor_ordering_fields = ['id']
+    cursor_default_ordering = 'id'
+    customer_list_fields = (
+        "ImageField", "image_variants",
+        "user__username", "user__first_name", "user__last_name", "user__type", "user__date_joined",
+    )
+    business_list_fields = (
+        "ImageField", "image_variants", "location", "tel", "description", "working_hours",
+        "user__username", "user__first_name", "user__last_name", "user__type", "user__review_stats",
+    )
 
     def get_serializer_class(self):
+        """
+        Picks the list serializer matching the type of the requested user. 
+        The profile comes from the object memo, so retrieve still loads it 
+        only once.
+        """
         if self.action == "retrieve":
             instance = self.get_object()
             if instance.user.type == "business":
@@ -89,21 +106,35 @@ class UserProfilesViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=["get"], url_path="customer")
     def customer_type_list(self, request):
         """
-        Custom action to retrieve a list of all profiles belonging 
-        to users with the 'customer' type.
+        Custom action to retrieve a paginated list of all profiles 
+        belonging to users with the 'customer' type.
         """
-        requested_profiles = UserProfile.objects.filter(user__type="customer")
-
-        serializer = UserProfileListCustomerTypSerializer(requested_profiles, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_type_list_response(
+            "customer", UserProfileListCustomerTypSerializer, "user", self.customer_list_fields
+        )
     
     @action(detail=False, methods=["get"], url_path="business")
     def business_type_list(self, request):
         """
-        Custom action to retrieve a list of all profiles belonging 
-        to users with the 'business' type.
+        Custom action to retrieve a paginated list of all profiles 
+        belonging to users with the 'business' type.
         """
-        requested_profiles = UserProfile.objects.filter(user__type="business")
+        return self.get_type_list_response(
+            "business", UserProfileListBusinessTypSerializer, "user__review_stats", self.business_list_fields
+        )
 
-        serializer = UserProfileListBusinessTypSerializer(requested_profiles, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+    def get_type_list_response(self, user_type, serializer_class, related, fields):
+        """
+        Loads one page of profiles of the given user type with the user (and 
+        its rating statistics) joined in, restricted to the columns the list 
+        serializer reads. Supports page numbers and ?pagination=cursor.
+        """
+        requested_profiles = (
+            UserProfile.objects.filter(user__type=user_type)
+            .select_related(related)
+            .only(*fields)
+            .order_by("pk")
+        )
+        page = self.paginate_queryset(requested_profiles)
+        serializer = serializer_class(page, many=True)
+        return self.get_paginated_response(serializer.data)
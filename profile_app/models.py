@@ -2,15 +2,19 @@ from django.conf import settings
 from django.db import models
 from django.dispatch import receiver
 from django.db.models.signals import post_save  
+from core.dirty_fields import DirtyFieldsMixin
+from core.images import needs_variants, schedule_variants
 
 
-class UserProfile(models.Model):
+class UserProfile(DirtyFieldsMixin, models.Model):
     """
     Extends the base User model with additional profile information.
 
     This model stores supplementary data for both customers and business users,
     including contact details, location, and professional descriptions. 
-    It is linked to the authentication user via a OneToOne relationship.
+    It is linked to the authentication user via a OneToOne relationship and 
+    created together with the user at registration. Saves only write the 
+    changed columns (see DirtyFieldsMixin).
     """
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -24,6 +28,8 @@ class UserProfile(models.Model):
         null=True,
     )
 
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+
     location = models.CharField(
         max_length=100,
         blank=True,
@@ -47,17 +53,7 @@ class UserProfile(models.Model):
         null=True,
     )
 
-    @receiver(post_save, sender=settings.AUTH_USER_MODEL)
-    def create_or_update_user_profile(sender, instance, created, **kwargs):
-        """
-        Signal receiver to manage UserProfile lifecycle.
-        """
-        if created:
-            UserProfile.objects.get_or_create(user=instance)
-        
-        if hasattr(instance, 'profile'):
-            instance.profile.save()
-
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         """
@@ -66,4 +62,14 @@ class UserProfile(models.Model):
         Uses the related user's username for display purposes
         (e.g. in Django Admin or debug output).
         """
-        return self.user.username
\ No newline at end of file
+        return self.user.username
+
+
+@receiver(post_save, sender=UserProfile)
+def schedule_profile_image_variants(sender, instance, **kwargs):
+    """
+    Signal receiver that queues the generation of resized variants 
+    whenever a new profile image was stored.
+    """
+    if needs_variants(instance, 'ImageField'):
+        schedule_variants(instance, 'ImageField')
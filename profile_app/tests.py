@@ -1,8 +1,15 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from user_auth_app.models import CustomUser
 from profile_app.models import UserProfile
+from profile_app.api.views import UserProfilesViewSet
+from reviews_app.models import Reviews
 
 class UserProfilePermissionsTests(APITestCase):
 
@@ -75,13 +82,111 @@ class UserProfilePermissionsTests(APITestCase):
         response = self.client.get(self.customer_list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["user"], self.user_a.id)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["user"], self.user_a.id)
 
     def test_business_list_returns_only_business_profiles(self):
         self.client.force_authenticate(user=self.user_a)
         response = self.client.get(self.business_list_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["user"], self.user_b.id)
\ No newline at end of file
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["user"], self.user_b.id)
+
+    def test_profile_retrieve_supports_conditional_get(self):
+        self.client.force_authenticate(user=self.user_a)
+        response = self.client.get(self.detail_url_b)
+        etag = response.headers['ETag']
+
+        response = self.client.get(self.detail_url_b, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.force_authenticate(user=self.user_b)
+        self.client.patch(self.detail_url_b, data={"location": "Bremen"}, format="json")
+        response = self.client.get(self.detail_url_b, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["location"], "Bremen")
+
+    def test_review_changes_the_profile_rating_and_etag(self):
+        self.client.force_authenticate(user=self.user_a)
+        etag = self.client.get(self.detail_url_b).headers["ETag"]
+
+        Reviews.objects.create(reviewer=self.user_a, business_user=self.user_b, rating=5, description="Top")
+
+        response = self.client.get(self.detail_url_b, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rating"]["average_rating"], 5.0)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_profiles_retrieve_picks_serializer_by_user_type(self):
+        self.client.force_authenticate(user=self.user_a)
+        with self.assertNumQueries(1):
+            resp = self.client.get(reverse("profiles-detail", kwargs={"pk": self.profile_b.pk}))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual((resp.data["type"], resp.data["location"]), ("business", "Hamburg"))
+
+        resp = self.client.get(reverse("profiles-detail", kwargs={"pk": self.profile_a.pk}))
+        self.assertNotIn("location", resp.data)
+        resp = self.client.get(reverse("profiles-detail", kwargs={"pk": 9999}))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_type_lists_are_paginated_without_per_row_queries(self):
+        for i in range(3):
+            user = CustomUser.objects.create_user(username=f"business_{i}", password="pw", type="business")
+            UserProfile.objects.create(user=user)
+        self.client.force_authenticate(user=self.user_a)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.business_list_url, {"page_size": 2})
+        self.assertEqual(response.data["count"], 4)
+        self.assertEqual(
+            [item["user"] for item in response.data["results"]],
+            [self.user_b.id, CustomUser.objects.get(username="business_0").id],
+        )
+        self.assertEqual(response.data["results"][0]["location"], "Hamburg")
+        self.assertIn("rating", response.data["results"][0])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.business_list_url, {"pagination": "cursor", "page_size": 3})
+        self.assertEqual(len(response.data["results"]), 3)
+        response = self.client.get(response.data["next"])
+        self.assertEqual([item["username"] for item in response.data["results"]], ["business_2"])
+        self.assertIsNone(response.data["next"])
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.customer_list_url)
+        self.assertEqual(response.data["results"][0]["username"], "user_a")
+
+    @override_settings(ASYNC_READ_VIEWS=False)
+    def test_sync_retrieve_loads_the_profile_once(self):
+        self.client.force_authenticate(user=self.user_a)
+        url = reverse("profiles-detail", kwargs={"pk": self.profile_b.pk})
+
+        with mock.patch.object(
+            UserProfilesViewSet, "check_object_permissions", autospec=True
+        ) as check, self.assertNumQueries(1):
+            resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["location"], "Hamburg")
+        self.assertEqual(check.call_count, 1)
+
+    def test_own_profile_update_loads_the_profile_once(self):
+        self.client.force_authenticate(user=self.user_a)
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.patch(self.detail_url_a, data={"location": "Köln"}, format="json")
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        selects = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("SELECT")]
+        self.assertEqual(sum('FROM "profile_app_userprofile"' in sql for sql in selects), 1)
+
+    def test_user_only_update_changes_the_profile_etag(self):
+        self.client.force_authenticate(user=self.user_b)
+        etag = self.client.get(self.detail_url_b).headers["ETag"]
+
+        self.client.patch(self.detail_url_b, data={"first_name": "Bea"}, format="json")
+
+        response = self.client.get(self.detail_url_b, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["first_name"], "Bea")
+
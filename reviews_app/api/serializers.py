@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from reviews_app.models import Reviews
+from django.core.exceptions import ObjectDoesNotExist
+from reviews_app.models import Reviews, ReviewStats
 from rest_framework.validators import UniqueTogetherValidator
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -14,4 +15,50 @@ class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reviews
         fields = ['id', 'business_user', 'reviewer',  'rating', 'description', 'created_at', 'updated_at']
-        read_only_fields = ['reviewer']
\ No newline at end of file
+        read_only_fields = ['reviewer']
+
+
+class ReviewStatsSerializer(serializers.ModelSerializer):
+    """
+    Read-only representation of the materialized rating statistics 
+    of a business user.
+    """
+    average_rating = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = ReviewStats
+        fields = ['review_count', 'average_rating', 'histogram', 'last_review_at']
+        read_only_fields = fields
+
+
+# Columns of the joined statistics that change whenever the representation
+# of UserRatingField(source="user") does; views list them as validator_fields.
+USER_RATING_VALIDATOR_FIELDS = (
+    'user__review_stats__last_review_at',
+    'user__review_stats__review_count',
+    'user__review_stats__rating_sum',
+)
+
+
+class UserRatingField(serializers.Field):
+    """
+    Read-only field exposing the rating statistics of the user the source 
+    resolves to. Reads the joined 'review_stats' relation, so querysets 
+    should use select_related('user__review_stats') to avoid extra queries. 
+    Users that are not business users get None.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, user):
+        if user.type != 'business':
+            return None
+        try:
+            stats = user.review_stats
+        except ObjectDoesNotExist:
+            stats = ReviewStats()
+        return ReviewStatsSerializer(stats, context=self.context).data
+
@@ -6,6 +6,8 @@ from reviews_app.models import Reviews
 from django_filters.rest_framework import DjangoFilterBackend
 import django_filters
 from rest_framework.exceptions import ValidationError
+from core.async_views import AsyncReadMixin
+from core.pagination import StandardResultsSetPagination
 
 class ReviewFilter(django_filters.FilterSet):
     """
@@ -20,11 +22,13 @@ class ReviewFilter(django_filters.FilterSet):
         model = Reviews
         fields = []
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+class ReviewsViewSet(AsyncReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling review operations.
     Supports list, retrieval, creation, and modification of reviews.
     Includes duplicate check logic to ensure one review per business user per customer.
+    The list is paginated (?page=, or ?pagination=cursor for keyset pages) and
+    served as a coroutine (see AsyncReadMixin).
     """
     queryset = Reviews.objects.all()   
     serializer_class = ReviewSerializer
@@ -33,6 +37,10 @@ class ReviewsViewSet(viewsets.ModelViewSet):
     filterset_class = ReviewFilter
     ordering = ('-updated_at',) 
     ordering_fields = ['updated_at', 'rating', 'created_at']
+    pagination_class = StandardResultsSetPagination
+    cursor_ordering_fields = ['updated_at', 'rating', 'created_at']
+    cursor_default_ordering = '-updated_at'
+    async_actions = ('list',)
 
     def get_permissions(self):
         """
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from reviews_app.models import PlatformReviewStats, ReviewStats
+
+
+class Command(BaseCommand):
+    """
+    Recalculates the materialized rating statistics of all business users 
+    and the platform rollup. Needed once after the statistics were 
+    introduced, or after reviews were written with raw SQL.
+    """
+    help = "Rebuilds the rating statistics from the reviews table."
+
+    def handle(self, *args, **options):
+        ReviewStats.objects.rebuild()
+        platform = PlatformReviewStats.current()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt the statistics of {ReviewStats.objects.count()} business users "
+            f"({platform.review_count} reviews)."
+        ))
@@ -1,5 +1,69 @@
-from django.db import models
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from core import settings
+from offers_app.cache import offer_list_cache
+
+
+RATING_RANGE = range(1, 6)
+
+
+def _stats_deltas(rows, sign=1):
+    """
+    Turns (business_user_id, rating, amount) rows into stats deltas per 
+    business user. Ratings outside 1-5 count towards the total and the sum 
+    but have no histogram bucket.
+    """
+    deltas = defaultdict(Counter)
+    for business_user_id, rating, amount in rows:
+        fields = deltas[business_user_id]
+        fields['review_count'] += sign * amount
+        fields['rating_sum'] += sign * amount * rating
+        if rating in RATING_RANGE:
+            fields[f'rating_{rating}'] += sign * amount
+    return deltas
+
+
+class ReviewsQuerySet(models.QuerySet):
+    """
+    QuerySet for reviews that keeps the rating statistics in sync on bulk 
+    writes, which bypass Reviews.save(). Deletes are covered by the 
+    post_delete receiver below.
+    """
+
+    def update(self, **kwargs):
+        if not {'rating', 'business_user', 'business_user_id'} & set(kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            before = list(
+                self.order_by().values_list('business_user_id', 'rating').annotate(amount=Count('pk'))
+            )
+            rows = super().update(**kwargs)
+            new_rating = kwargs.get('rating')
+            new_business = kwargs.get('business_user', kwargs.get('business_user_id'))
+            new_business = getattr(new_business, 'pk', new_business)
+            after = [
+                (business if new_business is None else new_business, rating if new_rating is None else new_rating, amount)
+                for business, rating, amount in before
+            ]
+            ReviewStats.objects.apply(_stats_deltas(before, -1), _stats_deltas(after))
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            created_rows = [obj for obj in created if obj.pk is not None]
+            touched = {}
+            for obj in created_rows:
+                touched[obj.business_user_id] = max(obj.updated_at, touched.get(obj.business_user_id, obj.updated_at))
+            ReviewStats.objects.apply(
+                _stats_deltas((obj.business_user_id, obj.rating, 1) for obj in created_rows), touched=touched
+            )
+        return created
 
 class Reviews(models.Model):
     """
@@ -27,11 +91,207 @@ class Reviews(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ReviewsQuerySet.as_manager()
+
     class Meta:
         """
         Metadata and constraints for the Reviews model.
         
         Enforces a unique constraint to ensure that a reviewer can only 
-        submit one review for a specific business user.
+        submit one review for a specific business user. The indexes back 
+        the keyset pagination sort keys, the per-user ones the review lists 
+        of a business user or reviewer in the default order.
+        """
+        unique_together = ['business_user', 'reviewer']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='review_updated_at_id_idx'),
+            models.Index(fields=['created_at', 'id'], name='review_created_at_id_idx'),
+            models.Index(fields=['rating', 'id'], name='review_rating_id_idx'),
+            models.Index(fields=['business_user', '-updated_at', '-id'], name='review_business_updated_idx'),
+            models.Index(fields=['reviewer', '-updated_at', '-id'], name='review_reviewer_updated_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stats_state = (instance.business_user_id, instance.rating)
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the review and updates the rating statistics of the business 
+        user and of the platform in the same transaction.
+        """
+        previous = getattr(self, '_stats_state', None)
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+            current = (self.business_user_id, self.rating)
+            removed = _stats_deltas([(*previous, 1)], -1) if previous else {}
+            ReviewStats.objects.apply(
+                removed, _stats_deltas([(*current, 1)]), touched={self.business_user_id: self.updated_at}
+            )
+        self._stats_state = current
+
+
+class RatingStatsQuerySet(models.QuerySet):
+    """
+    Shared write path of the per-business and the platform statistics.
+    """
+
+    def add(self, lookup, fields, last_review_at=None):
+        """
+        Adds the deltas to the row matching lookup with one UPDATE. The row 
+        is created for positive deltas only, so cascades from a deleted 
+        business user never recreate it.
+        """
+        changes = {
+            field: F(field) + amount if amount > 0 else Greatest(F(field) + amount, Value(0))
+            for field, amount in fields.items() if amount
+        }
+        if last_review_at is not None:
+            stamp = Value(last_review_at, output_field=models.DateTimeField())
+            changes['last_review_at'] = Greatest(Coalesce(F('last_review_at'), stamp), stamp)
+        if not changes:
+            return
+        if self.filter(**lookup).update(**changes):
+            return
+        if any(amount < 0 for amount in fields.values()):
+            return
+        try:
+            with transaction.atomic(using=self.db):
+                self.create(**lookup, **fields, last_review_at=last_review_at)
+        except IntegrityError:
+            # Created concurrently in the meantime.
+            self.filter(**lookup).update(**changes)
+
+
+class ReviewStatsQuerySet(RatingStatsQuerySet):
+    """
+    QuerySet for the per-business statistics.
+    """
+
+    def apply(self, *deltas, touched=None):
+        """
+        Applies per-business deltas to the business rows and their sum to the 
+        platform row. 'touched' maps business user ids to the time of their 
+        newest written review. The cached offer list embeds the statistics, 
+        so it is invalidated as well.
         """
-        unique_together = ['business_user', 'reviewer']
\ No newline at end of file
+        touched = touched or {}
+        merged = defaultdict(Counter)
+        for delta in deltas:
+            for business_user_id, fields in delta.items():
+                merged[business_user_id].update(fields)
+        for business_user_id in touched:
+            merged.setdefault(business_user_id, Counter())
+
+        total = Counter()
+        for business_user_id, fields in merged.items():
+            self.add({'business_user_id': business_user_id}, fields, touched.get(business_user_id))
+            total.update(fields)
+        PlatformReviewStats.objects.add(
+            {'pk': PlatformReviewStats.PLATFORM}, total, max(touched.values(), default=None)
+        )
+        if merged:
+            offer_list_cache.bump()
+
+    def rebuild(self):
+        """
+        Recalculates all statistics from the reviews table in one pass each.
+        """
+        aggregates = dict(
+            review_count=Count('pk'),
+            rating_sum=Coalesce(Sum('rating'), 0),
+            last_review_at=Max('updated_at'),
+            **{
+                f'rating_{rating}': Count('pk', filter=models.Q(rating=rating))
+                for rating in RATING_RANGE
+            },
+        )
+        rows = Reviews.objects.order_by().values('business_user_id').annotate(**aggregates)
+        with transaction.atomic(using=self.db):
+            self.all().delete()
+            self.bulk_create([ReviewStats(**row) for row in rows])
+            PlatformReviewStats.objects.all().delete()
+            PlatformReviewStats.objects.create(
+                pk=PlatformReviewStats.PLATFORM, **Reviews.objects.order_by().aggregate(**aggregates)
+            )
+        offer_list_cache.bump()
+
+
+class RatingStats(models.Model):
+    """
+    Abstract base of the materialized rating statistics: number of reviews, 
+    sum of all ratings, a 1-5 star histogram and the time of the newest 
+    review. The average is derived from count and sum, so reading the 
+    statistics never needs an aggregate query.
+    """
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    last_review_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return 0
+        return round(self.rating_sum / self.review_count, 1)
+
+    @property
+    def histogram(self):
+        return {str(rating): getattr(self, f'rating_{rating}') for rating in RATING_RANGE}
+
+
+class ReviewStats(RatingStats):
+    """
+    Rating statistics of one business user, kept up to date in the same 
+    transaction as every review create, update and delete. 
+    Run 'python manage.py rebuild_review_stats' after importing reviews 
+    with raw SQL.
+    """
+    business_user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="review_stats",
+    )
+
+    objects = ReviewStatsQuerySet.as_manager()
+
+
+class PlatformReviewStats(RatingStats):
+    """
+    Platform-wide rollup of all reviews, stored in a single row.
+    """
+    PLATFORM = 1
+
+    objects = RatingStatsQuerySet.as_manager()
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=cls.PLATFORM).first() or cls(pk=cls.PLATFORM)
+
+
+@receiver(post_delete, sender=Reviews)
+def remove_review_from_stats(sender, instance, **kwargs):
+    """
+    Signal receiver that takes a deleted review out of the statistics. 
+    If it was the newest review, the last review time is looked up again 
+    from the remaining reviews.
+    """
+    ReviewStats.objects.apply(_stats_deltas([(instance.business_user_id, instance.rating, 1)], -1))
+    newest = Reviews.objects.order_by('-updated_at').values('updated_at')
+    ReviewStats.objects.filter(
+        business_user_id=instance.business_user_id, last_review_at__lte=instance.updated_at
+    ).update(last_review_at=Subquery(newest.filter(business_user=OuterRef('business_user'))[:1]))
+    PlatformReviewStats.objects.filter(
+        pk=PlatformReviewStats.PLATFORM, last_review_at__lte=instance.updated_at
+    ).update(last_review_at=Subquery(newest[:1]))
+
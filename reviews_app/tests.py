@@ -2,7 +2,12 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
-from reviews_app.models import Reviews
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from offers_app.models import Offer
+from profile_app.models import UserProfile
+from reviews_app.models import PlatformReviewStats, Reviews, ReviewStats
+from rest_framework.authtoken.models import Token
 
 User = get_user_model()
 
@@ -94,4 +99,121 @@ class ReviewAPITests(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Sicherstellen, dass nur das eine Review zurückkommt
-        self.assertEqual(len(response.data), 1)
\ No newline at end of file
+        self.assertEqual(response.data['count'], 1)
+
+    def test_list_is_paginated(self):
+        Reviews.objects.create(reviewer=self.customer, business_user=self.seller, rating=5, description="A")
+        Reviews.objects.create(reviewer=self.other_customer, business_user=self.seller, rating=3, description="B")
+        self.client.force_authenticate(user=self.customer)
+
+        response = self.client.get(self.list_url, {'page_size': 1})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([item['description'] for item in response.data['results']], ["B"])
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(self.list_url, {'pagination': 'cursor', 'page_size': 1, 'ordering': 'rating'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['rating'] for item in response.data['results']], [3])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['rating'] for item in response.data['results']], [5])
+        self.assertIsNone(response.data['next'])
+
+    async def test_list_is_served_asynchronously_with_token(self):
+        await Reviews.objects.acreate(reviewer=self.customer, business_user=self.seller, rating=4, description="A")
+        token = await Token.objects.acreate(user=self.customer)
+
+        response = await self.async_client.get(self.list_url, headers={'Authorization': f'Token {token.key}'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['rating'] for item in response.json()['results']], [4])
+        response = await self.async_client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ReviewStatsTests(APITestCase):
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', password='password123', type='business')
+        self.other_seller = User.objects.create_user(username='seller2', password='password123', type='business')
+        self.customers = [
+            User.objects.create_user(username=f'buyer{i}', password='password123', type='customer')
+            for i in range(3)
+        ]
+
+    def stats(self, user):
+        return ReviewStats.objects.filter(business_user=user).first()
+
+    def assertStats(self, stats, count, total, histogram):
+        self.assertEqual((stats.review_count, stats.rating_sum), (count, total))
+        self.assertEqual(stats.histogram, {str(rating): histogram.get(rating, 0) for rating in range(1, 6)})
+
+    def test_stats_follow_create_update_and_delete(self):
+        first = Reviews.objects.create(reviewer=self.customers[0], business_user=self.seller, rating=5, description="A")
+        second = Reviews.objects.create(reviewer=self.customers[1], business_user=self.seller, rating=3, description="B")
+        self.assertStats(self.stats(self.seller), 2, 8, {5: 1, 3: 1})
+        self.assertEqual(self.stats(self.seller).average_rating, 4.0)
+        self.assertEqual(self.stats(self.seller).last_review_at, second.updated_at)
+
+        first.rating = 4
+        first.save()
+        self.assertStats(self.stats(self.seller), 2, 7, {4: 1, 3: 1})
+
+        Reviews.objects.filter(pk=second.pk).update(business_user=self.other_seller)
+        self.assertStats(self.stats(self.seller), 1, 4, {4: 1})
+        self.assertStats(self.stats(self.other_seller), 1, 3, {3: 1})
+
+        first.delete()
+        stats = self.stats(self.seller)
+        self.assertStats(stats, 0, 0, {})
+        self.assertIsNone(stats.last_review_at)
+
+        platform = PlatformReviewStats.current()
+        self.assertStats(platform, 1, 3, {3: 1})
+        self.assertEqual(platform.last_review_at, Reviews.objects.get().updated_at)
+
+    def test_rebuild_matches_incremental_stats(self):
+        Reviews.objects.bulk_create([
+            Reviews(reviewer=customer, business_user=self.seller, rating=rating, description="Bulk")
+            for customer, rating in zip(self.customers, (2, 5, 5))
+        ])
+        incremental = self.stats(self.seller)
+        self.assertStats(incremental, 3, 12, {2: 1, 5: 2})
+
+        ReviewStats.objects.rebuild()
+
+        rebuilt = self.stats(self.seller)
+        self.assertStats(rebuilt, 3, 12, {2: 1, 5: 2})
+        self.assertEqual(rebuilt.last_review_at, incremental.last_review_at)
+        self.assertStats(PlatformReviewStats.current(), 3, 12, {2: 1, 5: 2})
+
+    def test_offer_and_profile_include_rating_without_aggregate(self):
+        Reviews.objects.create(reviewer=self.customers[0], business_user=self.seller, rating=4, description="A")
+        UserProfile.objects.create(user=self.seller)
+        offer = Offer.objects.create(user=self.seller, title="Rated", description="Offer")
+        self.client.force_authenticate(user=self.customers[0])
+
+        with CaptureQueriesContext(connection) as queries:
+            offer_data = self.client.get(reverse('offers-detail', kwargs={'pk': offer.pk})).data
+            profile_data = self.client.get(reverse('profile-detail', kwargs={'pk': self.seller.pk})).data
+
+        self.assertEqual(offer_data['user_rating']['review_count'], 1)
+        self.assertEqual(profile_data['rating']['average_rating'], 4.0)
+        self.assertFalse(any('"reviews_app_reviews"' in query['sql'] for query in queries.captured_queries))
+
+    def test_base_info_reads_platform_stats(self):
+        Reviews.objects.create(reviewer=self.customers[0], business_user=self.seller, rating=4, description="A")
+        Reviews.objects.create(reviewer=self.customers[1], business_user=self.seller, rating=5, description="B")
+
+        response = self.client.get(reverse('base-info-list'))
+
+        self.assertEqual(response.data['review_count'], 2)
+        self.assertEqual(response.data['average_rating'], 4.5)
+
+    def test_business_user_listing_uses_index(self):
+        Reviews.objects.create(reviewer=self.customers[0], business_user=self.seller, rating=4, description="A")
+        queryset = Reviews.objects.filter(business_user=self.seller).order_by('-updated_at', '-id')[:10]
+
+        plan = queryset.explain()
+
+        self.assertIn('review_business_updated_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
@@ -1,6 +1,18 @@
 from django.contrib import admin
+from profile_app.models import UserProfile
 from .models import CustomUser
 
-admin.site.register(CustomUser)
+
+@admin.register(CustomUser)
+class CustomUserAdmin(admin.ModelAdmin):
+    """
+    Admin for user accounts. Users added here get their UserProfile in the
+    same transaction, like registered users.
+    """
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change:
+            UserProfile.objects.create(user=obj)
 
 # Register your models here.
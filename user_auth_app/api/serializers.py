@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from profile_app.models import UserProfile
 from user_auth_app.models import CustomUser
@@ -13,6 +14,15 @@ class CustomUserSerializer(serializers.ModelSerializer):
         model = CustomUser
         fields = ["username", "email", "password", "type"]
 
+    def create(self, validated_data):
+        """
+        Creates the user together with its UserProfile in one transaction.
+        """
+        with transaction.atomic():
+            user = super().create(validated_data)
+            UserProfile.objects.create(user=user)
+        return user
+
 
 class RegistrationsSerializer(serializers.ModelSerializer):
     """
@@ -37,7 +47,7 @@ class RegistrationsSerializer(serializers.ModelSerializer):
         """
         Creates a new CustomUser and an accompanying UserProfile.
         Validates that both password fields match, hashes the password 
-        using set_password(), and triggers profile creation.
+        using set_password(), and creates the profile in the same transaction.
         """
         pw = self.validated_data["password"]
         repeated_pw = self.validated_data["repeated_password"]
@@ -54,7 +64,9 @@ class RegistrationsSerializer(serializers.ModelSerializer):
         )
         
         account.set_password(pw)
-        account.save()  
+        with transaction.atomic():
+            account.save()
+            UserProfile.objects.create(user=account)
 
         return account
 
@@ -97,7 +97,8 @@ class LogoutView(APIView):
     
     Requires an authenticated request. Upon invocation, it identifies 
     and deletes the current authentication token from the database, 
-    effectively invalidating the session.
+    effectively invalidating the session. Deleting the token also removes 
+    it from the token cache of every process (see core.authentication).
     """
     permission_classes = [IsAuthenticated]
 
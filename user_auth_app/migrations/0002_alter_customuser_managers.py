@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:16
+
+import user_auth_app.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_auth_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', user_auth_app.models.CustomUserManager()),
+            ],
+        ),
+    ]
@@ -1,14 +1,36 @@
-from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
 
+from core.authentication import token_cache
+from core.dirty_fields import DirtyFieldsMixin
+from profile_app.models import UserProfile
 
-class CustomUser(AbstractUser):
+
+class CustomUserManager(UserManager):
+    """
+    User manager that gives administrators created with 'createsuperuser' 
+    their profile right away. Regular accounts get theirs where they are 
+    created: at registration, in CustomUserSerializer and in the admin.
+    """
+
+    def create_superuser(self, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            user = super().create_superuser(*args, **kwargs)
+            UserProfile.objects.using(self.db).create(user=user)
+        return user
+
+
+class CustomUser(DirtyFieldsMixin, AbstractUser):
     """
     Custom user model for the Coderr platform.
     
     Extends Django's AbstractUser to include a 'type' field, allowing 
     the application to distinguish between customers and business providers 
-    at the authentication level.
+    at the authentication level. Saves only write the changed columns 
+    (see DirtyFieldsMixin).
     """
     class Usertype(models.TextChoices):
         """
@@ -23,4 +45,33 @@ class CustomUser(AbstractUser):
         max_length=20,
         choices=Usertype.choices,
         default=Usertype.CUSTOMER,
-    )
\ No newline at end of file
+    )
+
+    objects = CustomUserManager()
+
+
+@receiver(post_delete, sender=Token)
+def revoke_cached_token(sender, instance, **kwargs):
+    """
+    Signal receiver that ends cached authentications of a deleted token, 
+    e.g. on logout, in every process.
+    """
+    token_cache.revoke_token(instance.key)
+
+
+@receiver(post_save, sender=CustomUser)
+def revoke_cached_user_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Cached tokens carry a copy of some user fields (TokenCache.USER_FIELDS), 
+    so changing any of them drops the tokens of the user.
+    """
+    if created:
+        return
+    if update_fields is None or set(token_cache.USER_FIELDS).intersection(update_fields):
+        token_cache.revoke_user(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser)
+def revoke_cached_user_on_delete(sender, instance, **kwargs):
+    token_cache.revoke_user(instance.pk)
+
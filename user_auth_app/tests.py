@@ -1,3 +1,211 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth.models import update_last_login
+from django.db import DatabaseError, connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from core.authentication import CachedTokenAuthentication, TokenCache, token_cache
+from profile_app.models import UserProfile
+from user_auth_app.admin import CustomUserAdmin
+from user_auth_app.api.serializers import CustomUserSerializer
+from user_auth_app.models import CustomUser
+
+
+class RegistrationTests(APITestCase):
+
+    def test_registration_creates_the_profile(self):
+        response = self.client.post(reverse('registration'), {
+            'username': 'neu', 'email': 'neu@example.com', 'password': 'sicheresPassword123',
+            'repeated_password': 'sicheresPassword123', 'type': 'business',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(UserProfile.objects.filter(user_id=response.data['user_id']).exists())
+
+    def test_superuser_gets_a_profile(self):
+        admin = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'sicheresPassword123')
+
+        self.assertTrue(UserProfile.objects.filter(user=admin).exists())
+
+    def test_user_serializer_creates_the_profile(self):
+        serializer = CustomUserSerializer(data={
+            'username': 'api', 'email': 'api@example.com', 'password': 'sicheresPassword123', 'type': 'customer',
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        user = serializer.save()
+
+        self.assertTrue(UserProfile.objects.filter(user=user).exists())
+
+    def test_admin_creates_the_profile_of_added_users_only(self):
+        request = RequestFactory().post('/admin/')
+        model_admin = CustomUserAdmin(CustomUser, admin.site)
+        user = CustomUser(username='admin-added', type='business')
+
+        model_admin.save_model(request, user, form=None, change=False)
+        user.first_name = 'Ada'
+        model_admin.save_model(request, user, form=None, change=True)
+
+        self.assertEqual(UserProfile.objects.filter(user=user).count(), 1)
+
+
+class DirtyFieldTests(APITestCase):
+
+    def setUp(self):
+        created = CustomUser.objects.create_user(username='kunde', password='sicheresPassword123', type='customer')
+        UserProfile.objects.create(user=created, location='Berlin')
+        self.user = CustomUser.objects.get(pk=created.pk)
+        self.profile = UserProfile.objects.get(user=created)
+
+    def test_login_only_writes_last_login(self):
+        with CaptureQueriesContext(connection) as queries:
+            update_last_login(None, self.user)
+
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertIn('SET "last_login"', queries.captured_queries[0]['sql'])
+        self.assertNotIn('"username"', queries.captured_queries[0]['sql'])
+
+    def test_unchanged_instances_are_not_written(self):
+        with self.assertNumQueries(0):
+            self.user.save()
+            self.profile.save()
+
+    def test_save_writes_only_changed_columns(self):
+        updated_at = self.profile.updated_at
+        self.profile.tel = '12345'
+        self.profile.image_variants['source'] = 'profile_files/a.png'
+
+        with CaptureQueriesContext(connection) as queries:
+            self.profile.save()
+
+        sql = queries.captured_queries[0]['sql']
+        self.assertEqual(len(queries.captured_queries), 1)
+        for column in ('"tel"', '"image_variants"', '"updated_at"'):
+            self.assertIn(column, sql)
+        self.assertNotIn('"location"', sql)
+        self.assertGreater(self.profile.updated_at, updated_at)
+        self.assertEqual(self.profile.get_dirty_fields(), [])
+
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.tel, self.profile.location), ('12345', 'Berlin'))
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.user = CustomUser.objects.create_user(username='kunde', password='sicheresPassword123', type='customer')
+        UserProfile.objects.create(user=self.user)
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('profile-detail', kwargs={'pk': self.user.pk})
+
+    def request_queries(self, path=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path or self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [query['sql'] for query in queries.captured_queries]
+
+    def auth_queries(self, queries):
+        return sum('"authtoken_token"' in sql or '"coderr_shared_cache"' in sql for sql in queries)
+
+    @override_settings(AUTH_TOKEN_REVOCATION_POLL_SECONDS=60)
+    def test_repeated_requests_run_no_authentication_query(self):
+        first = self.request_queries()
+        second = self.request_queries()
+
+        # The first request reads the revocation generation and the token.
+        self.assertEqual(self.auth_queries(first), 2)
+        self.assertEqual(self.auth_queries(second), 0)
+        self.assertEqual(len(second), len(first) - 2)
+
+    @override_settings(AUTH_TOKEN_REVOCATION_POLL_SECONDS=0)
+    def test_revocations_are_polled_once_per_interval(self):
+        self.request_queries()
+        second = self.request_queries()
+
+        self.assertEqual(sum('"coderr_shared_cache"' in sql for sql in second), 1)
+
+    def test_unreadable_shared_cache_falls_back_to_the_token_lookup(self):
+        broken = mock.Mock(**{'get.side_effect': DatabaseError, 'set.side_effect': DatabaseError})
+        broken.aget = mock.AsyncMock(side_effect=DatabaseError)
+        with mock.patch.object(TokenCache, 'cache', new_callable=mock.PropertyMock, return_value=broken):
+            self.assertEqual(self.auth_queries(self.request_queries()), 1)
+            self.assertEqual(self.auth_queries(self.request_queries()), 1)
+            response = self.client.post(reverse('logout'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cached_user_loads_other_fields_lazily(self):
+        self.client.get(self.url)
+        user, token = CachedTokenAuthentication().authenticate_credentials(self.token.key)
+
+        with self.assertNumQueries(0):
+            self.assertEqual((user.pk, user.type, user.is_active), (self.user.pk, 'customer', True))
+            self.assertEqual((user.username, user.email, user.get_full_name()), ('kunde', '', ''))
+            self.assertEqual(token.user_id, self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.date_joined, self.user.date_joined)
+
+    def test_changing_a_cached_field_revokes_the_tokens(self):
+        self.client.get(self.url)
+
+        user = CustomUser.objects.get(pk=self.user.pk)
+        user.first_name = 'Kim'
+        user.save()
+
+        user, _ = CachedTokenAuthentication().authenticate_credentials(self.token.key)
+        self.assertEqual(user.first_name, 'Kim')
+
+    @override_settings(AUTH_TOKEN_CACHE_ALIAS='default')
+    def test_process_local_alias_disables_the_cache(self):
+        self.assertFalse(token_cache.enabled)
+        self.assertEqual(self.auth_queries(self.request_queries()), 1)
+        self.assertEqual(self.auth_queries(self.request_queries()), 1)
+
+    def test_logout_revokes_the_token_in_every_process(self):
+        other_process = TokenCache()
+        self.client.get(self.url)
+        other_process.store(Token.objects.select_related('user').get(pk=self.token.pk), other_process.generation)
+        self.assertIsNotNone(other_process._get(self.token.key))
+
+        response = self.client.post(reverse('logout'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertIsNone(other_process.lookup(self.token.key))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivating_the_user_revokes_its_tokens(self):
+        self.client.get(self.url)
+
+        user = CustomUser.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_CACHE_SIZE=1)
+    def test_cache_is_bounded(self):
+        other = CustomUser.objects.create_user(username='zweiter', password='sicheresPassword123')
+        other_token = Token.objects.create(user=other)
+        self.client.get(self.url)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {other_token.key}')
+        self.client.get(self.url)
+
+        self.assertIsNone(token_cache.lookup(self.token.key))
+        self.assertIsNotNone(token_cache.lookup(other_token.key))
+
+    @override_settings(AUTH_TOKEN_CACHE_TTL=0, AUTH_TOKEN_REVOCATION_POLL_SECONDS=60)
+    def test_entries_expire(self):
+        self.assertEqual(self.auth_queries(self.request_queries()), 2)
+        self.assertEqual(self.auth_queries(self.request_queries()), 1)
 
-# Create your tests here.